@@ -0,0 +1,269 @@
+# Нагрузочный стенд для всего бота: настоящий Dispatcher из bot.py (все роутеры и middleware),
+# Bot с подменённой сессией, которая записывает вызовы API, и временная SQLite-база.
+# Воспроизводит сгенерированные или записанные потоки апдейтов с заданной частотой и печатает
+# updates/sec, p50/p99 задержки, число SQL-запросов и вызовов API на апдейт.
+#
+#   python -m benchmarks.dispatcher_load --scenario mixed --users 8 --rounds 20 [--rate 200]
+#   python -m benchmarks.dispatcher_load --record stream.jsonl   # сохранить сгенерированный поток
+#   python -m benchmarks.dispatcher_load --replay stream.jsonl   # воспроизвести записанный поток
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.types import Chat, Message, Update
+
+SCENARIOS = ("add_order", "pagination", "edit_burst", "mixed")
+SEED_PLATFORMS = 10
+SEED_ORDERS = 200
+# date=0 у сообщения в callback_query означает InaccessibleMessage
+MESSAGE_DATE = 1_700_000_000
+
+
+class RecordingSession(BaseSession):
+    # Сессия без сети: запоминает вызванные методы и отвечает правдоподобными результатами
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._message_id = 1_000_000
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: int | None = None) -> Any:
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(method, SendMessage):
+            self._message_id += 1
+            return Message(
+                message_id=self._message_id, date=datetime.now(),
+                chat=Chat(id=method.chat_id, type="private"), text=method.text,
+            )
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+class StreamBuilder:
+    def __init__(self):
+        self.update_id = 0
+        self.message_id = 0
+
+    def _next_ids(self):
+        self.update_id += 1
+        self.message_id += 1
+        return self.update_id, self.message_id
+
+    @staticmethod
+    def _user(user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"admin{user_id}"}
+
+    def message(self, user_id: int, text: str) -> dict:
+        update_id, message_id = self._next_ids()
+        return {"update_id": update_id, "message": {
+            "message_id": message_id, "date": MESSAGE_DATE, "text": text,
+            "chat": {"id": user_id, "type": "private"}, "from": self._user(user_id),
+        }}
+
+    def callback(self, user_id: int, data: str, message_id: int | None = None) -> dict:
+        update_id, next_message_id = self._next_ids()
+        message_id = message_id or next_message_id
+        return {"update_id": update_id, "callback_query": {
+            "id": str(update_id), "chat_instance": str(user_id), "data": data, "from": self._user(user_id),
+            "message": {
+                "message_id": message_id, "date": MESSAGE_DATE, "text": "...",
+                "chat": {"id": user_id, "type": "private"}, "from": {"id": 42, "is_bot": True, "first_name": "bot"},
+            },
+        }}
+
+    def add_order(self, user_id: int, n: int) -> List[dict]:
+        from keyboards.inline import PlatformCallback
+        platform_id = n % SEED_PLATFORMS + 1
+        return [
+            self.message(user_id, "/start"),
+            self.callback(user_id, "create_order"),
+            self.message(user_id, f"Заказ {user_id}-{n}"),
+            self.callback(user_id, PlatformCallback(action="select_for_order", platform_id=platform_id).pack()),
+            self.callback(user_id, "skip_link"),
+            self.message(user_id, "Ожидает"),
+            self.callback(user_id, "skip_comment"),
+            self.callback(user_id, "confirm_save_order"),
+        ]
+
+    def pagination(self, user_id: int, n: int) -> List[dict]:
+        from keyboards.inline import Paginator
+        # Список редактируется на месте: все нажатия приходят с одного и того же сообщения
+        stream = [self.callback(user_id, "view_orders")]
+        message_id = stream[0]["callback_query"]["message"]["message_id"]
+        stream += [self.callback(user_id, Paginator(action="next", page=page).pack(), message_id) for page in range(2, 10)]
+        return stream
+
+    def edit_burst(self, user_id: int, n: int) -> List[dict]:
+        from keyboards.inline import OrderCallback
+        order_id = (user_id * 31 + n) % SEED_ORDERS + 1
+        return [
+            self.callback(user_id, OrderCallback(action="edit", order_id=order_id).pack()),
+            self.callback(user_id, f"edit_existing:payment_status:{order_id}"),
+            self.message(user_id, f"Оплачен {n}"),
+        ]
+
+    def build(self, scenario: str, users: int, rounds: int) -> List[dict]:
+        flows = [self.add_order, self.pagination, self.edit_burst] if scenario == "mixed" else [getattr(self, scenario)]
+        # Потоки пользователей перемежаются по одному апдейту, как в реальном getUpdates
+        per_user = []
+        for user_id in range(1, users + 1):
+            stream = []
+            for n in range(rounds):
+                stream += flows[n % len(flows)](user_id, n)
+            per_user.append(stream)
+        return [stream[i] for i in range(max(map(len, per_user))) for stream in per_user if i < len(stream)]
+
+
+async def seed_db(session_maker):
+    from database.models import Order, Platform
+    async with session_maker() as session:
+        session.add_all(Platform(name=f"Платформа {i}") for i in range(1, SEED_PLATFORMS + 1))
+        await session.flush()
+        session.add_all(
+            Order(name=f"Заказ {i}", platform_id=i % SEED_PLATFORMS + 1, payment_status="Ожидает")
+            for i in range(1, SEED_ORDERS + 1)
+        )
+        await session.commit()
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def run(args, raw_updates: List[dict]) -> Dict[str, Any]:
+    from sqlalchemy import event
+
+    import bot as bot_module
+    from database.engine import create_db, engine, session_maker
+
+    engine.echo = False
+    statements = Counter()
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[statement.split(None, 1)[0].upper()] += 1
+
+    await create_db()
+    await seed_db(session_maker)
+    statements.clear()
+
+    session = RecordingSession(latency=args.api_latency)
+    bot = Bot(token="42:TEST", session=session)
+    dp = bot_module.create_dispatcher()
+
+    handler_latency: List[float] = []
+    started_at: Dict[int, float] = {}
+    e2e_latency: List[float] = []
+
+    # Outer-middleware после OrderedUpdatesMiddleware выполняется уже в воркере: меряем хендлер
+    # вместе с сессией БД и проверкой доступа, e2e - вместе с ожиданием в очереди
+    async def measure(handler, event, data):
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            end = time.perf_counter()
+            handler_latency.append(end - start)
+            e2e_latency.append(end - started_at.pop(event.update_id, start))
+    dp.update.outer_middleware(measure)
+
+    updates = [Update.model_validate(raw, context={"bot": bot}) for raw in raw_updates]
+    interval = 1 / args.rate if args.rate else 0
+
+    begin = time.perf_counter()
+    for i, update in enumerate(updates):
+        if interval:
+            delay = begin + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        started_at[update.update_id] = time.perf_counter()
+        await dp.feed_update(bot, update)
+    await dp.emit_shutdown(bot=bot)
+    elapsed = time.perf_counter() - begin
+
+    await engine.dispose()
+    total = len(updates)
+    return {
+        "updates": total,
+        "seconds": round(elapsed, 3),
+        "updates_per_sec": round(total / elapsed, 1),
+        "handled": len(handler_latency),
+        "handler_p50_ms": round(percentile(handler_latency, 0.5) * 1000, 2),
+        "handler_p99_ms": round(percentile(handler_latency, 0.99) * 1000, 2),
+        "e2e_p50_ms": round(percentile(e2e_latency, 0.5) * 1000, 2),
+        "e2e_p99_ms": round(percentile(e2e_latency, 0.99) * 1000, 2),
+        "db_statements_per_update": round(sum(statements.values()) / total, 2),
+        "api_calls_per_update": round(sum(session.calls.values()) / total, 2),
+        "db_statements": dict(statements),
+        "api_calls": dict(session.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=10, help="flows per user")
+    parser.add_argument("--rate", type=float, default=0, help="updates per second, 0 = as fast as possible")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="simulated Telegram API latency, s")
+    parser.add_argument("--rate-limit", type=int, default=0, help="per-user RATE_LIMIT for the bot, 0 = disabled")
+    parser.add_argument("--replay", help="JSONL file with raw updates to replay")
+    parser.add_argument("--record", help="write the generated stream to a JSONL file and exit")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as f:
+            raw_updates = [json.loads(line) for line in f if line.strip()]
+    else:
+        raw_updates = StreamBuilder().build(args.scenario, args.users, args.rounds)
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for raw in raw_updates:
+                f.write(json.dumps(raw, ensure_ascii=False) + "\n")
+        print(f"Recorded {len(raw_updates)} updates to {args.record}")
+        return
+
+    user_ids = {
+        (raw.get("message") or raw.get("callback_query") or {}).get("from", {}).get("id")
+        for raw in raw_updates
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        # Окружение должно быть готово до импорта bot.py и database.engine
+        os.environ["DB_LITE"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'load.sqlite3')}"
+        os.environ["ADMIN_IDS"] = ",".join(str(user_id) for user_id in user_ids if user_id)
+        os.environ["GOOGLE_SHEETS_ENABLED"] = "0"
+        os.environ["RATE_LIMIT"] = str(args.rate_limit)
+        report = asyncio.run(run(args, raw_updates))
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    for key, value in report.items():
+        print(f"{key:>26}: {value}")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    main()
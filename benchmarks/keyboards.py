@@ -0,0 +1,52 @@
+# Микробенчмарки построителей клавиатур из keyboards/inline.py: холодная сборка (без кеша)
+# против повторного вызова с прогретым кешем.
+#
+#   python -m benchmarks.keyboards [--number 2000] [--platforms 30]
+import argparse
+import timeit
+from types import SimpleNamespace
+
+from keyboards import inline
+
+
+def builders(platforms, orders):
+    # (название, вызов с кешем, сборка без кеша)
+    return [
+        ("get_main_menu_keyboard", inline.get_main_menu_keyboard, inline.get_main_menu_keyboard.__wrapped__),
+        ("get_platform_management_keyboard", inline.get_platform_management_keyboard, inline.get_platform_management_keyboard.__wrapped__),
+        ("get_order_confirmation_keyboard", inline.get_order_confirmation_keyboard, inline.get_order_confirmation_keyboard.__wrapped__),
+        ("get_skip_keyboard", lambda: inline.get_skip_keyboard("skip_link"), lambda: inline.get_skip_keyboard.__wrapped__("skip_link")),
+        ("get_edit_action_keyboard", lambda: inline.get_edit_action_keyboard("back_to_confirmation"), lambda: inline.get_edit_action_keyboard.__wrapped__("back_to_confirmation")),
+        ("get_order_details_keyboard", lambda: inline.get_order_details_keyboard(42), lambda: inline.get_order_details_keyboard.__wrapped__(42)),
+        ("get_delete_confirmation_keyboard", lambda: inline.get_delete_confirmation_keyboard(42), lambda: inline.get_delete_confirmation_keyboard.__wrapped__(42)),
+        ("get_field_to_edit_keyboard", lambda: inline.get_field_to_edit_keyboard(42), lambda: inline.get_field_to_edit_keyboard.__wrapped__(42)),
+        ("get_platform_selection_keyboard", lambda: inline.get_platform_selection_keyboard(platforms),
+         lambda: inline._build_platform_selection_keyboard.__wrapped__(inline.get_platforms_version(platforms))),
+        ("get_delete_platform_keyboard", lambda: inline.get_delete_platform_keyboard(platforms),
+         lambda: inline._build_delete_platform_keyboard.__wrapped__(inline.get_platforms_version(platforms))),
+        ("get_orders_list_keyboard", lambda: inline.get_orders_list_keyboard(orders, page=3, total_pages=10), None),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000, help="calls per measurement")
+    parser.add_argument("--platforms", type=int, default=30, help="platforms in platform keyboards")
+    args = parser.parse_args()
+
+    platforms = [SimpleNamespace(id=i, name=f"Платформа {i}") for i in range(1, args.platforms + 1)]
+    orders = [SimpleNamespace(id=i, name=f"Заказ {i}") for i in range(1, 6)]
+
+    print(f"{'builder':<34} | {'uncached us':>11} | {'cached us':>9} | {'speedup':>7}")
+    for name, cached, uncached in builders(platforms, orders):
+        cached()  # прогрев кеша
+        cached_us = timeit.timeit(cached, number=args.number) / args.number * 1e6
+        if uncached is None:
+            print(f"{name:<34} | {'-':>11} | {cached_us:>9.2f} | {'-':>7}")
+            continue
+        uncached_us = timeit.timeit(uncached, number=args.number) / args.number * 1e6
+        print(f"{name:<34} | {uncached_us:>11.1f} | {cached_us:>9.2f} | {uncached_us / cached_us:>6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
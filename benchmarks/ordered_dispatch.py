@@ -0,0 +1,106 @@
+# Нагрузочный тест OrderedUpdatesMiddleware: пропускная способность в зависимости от числа
+# одновременно работающих админов и проверка порядка обработки апдейтов каждого из них.
+#
+#   python -m benchmarks.ordered_dispatch [--updates 50] [--api-latency 0.02] [--max-sessions 4]
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message, Update
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from middlewares.db import DataBaseSession
+from middlewares.ordering import OrderedUpdatesMiddleware
+
+ADMIN_COUNTS = (1, 2, 4, 8, 16)
+
+
+def build_update(bot: Bot, update_id: int, user_id: int, seq: int) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"admin{user_id}"},
+            "text": str(seq),
+        },
+    }, context={"bot": bot})
+
+
+def build_dispatcher(session_pool, seen: dict, api_latency: float, max_pending: int, max_sessions: int, ordered: bool):
+    router = Router()
+
+    @router.message()
+    async def handler(message: Message, session: AsyncSession):
+        await session.execute(text("UPDATE counters SET value = value + 1 WHERE id = 1"))
+        await session.commit()
+        seen[message.from_user.id].append(int(message.text))
+        # Имитация ответа Telegram API
+        await asyncio.sleep(api_latency)
+
+    dp = Dispatcher()
+    ordering = None
+    if ordered:
+        ordering = OrderedUpdatesMiddleware(max_pending=max_pending)
+        dp.update.outer_middleware(ordering)
+    dp.update.middleware(DataBaseSession(session_pool=session_pool, max_sessions=max_sessions))
+    dp.include_router(router)
+    return dp, ordering
+
+
+async def run(admins: int, args, session_pool, ordered: bool) -> float:
+    bot = Bot(token="42:TEST")
+    seen = defaultdict(list)
+    dp, ordering = build_dispatcher(session_pool, seen, args.api_latency, args.max_pending, args.max_sessions, ordered)
+
+    # Апдейты разных админов перемешаны, как в реальном getUpdates
+    updates = [
+        build_update(bot, seq * admins + user_id, user_id + 1, seq)
+        for seq in range(args.updates) for user_id in range(admins)
+    ]
+
+    started = time.perf_counter()
+    for update in updates:
+        # Так же, как polling-цикл при handle_as_tasks=False
+        await dp.feed_update(bot, update)
+    if ordering:
+        await ordering.wait_closed()
+    elapsed = time.perf_counter() - started
+    await bot.session.close()
+
+    for user_id, sequence in seen.items():
+        assert sequence == list(range(args.updates)), f"admin {user_id}: updates processed out of order"
+    return len(updates) / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=50, help="updates per admin")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="simulated Telegram API latency, s")
+    parser.add_argument("--max-pending", type=int, default=1000)
+    parser.add_argument("--max-sessions", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.sqlite3')}", connect_args={"timeout": 15})
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE counters (id INTEGER PRIMARY KEY, value INTEGER)"))
+            await conn.execute(text("INSERT INTO counters VALUES (1, 0)"))
+        session_pool = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        print(f"{'admins':>6} | {'sequential upd/s':>16} | {'ordered upd/s':>13} | {'speedup':>7}")
+        for admins in ADMIN_COUNTS:
+            sequential = await run(admins, args, session_pool, ordered=False)
+            ordered = await run(admins, args, session_pool, ordered=True)
+            print(f"{admins:>6} | {sequential:>16.1f} | {ordered:>13.1f} | {ordered / sequential:>6.1f}x")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+# Сериализация строк для Google Sheets на больших объёмах: прежнее построчное форматирование
+# ORM-объектов (astimezone + strftime, order.platform через joined-загрузку) против пакетной
+# сериализации кортежей из utils/serialization.py. Печатает rows/sec и проверяет, что результат
+# совпадает с прежним побайтно (в том числе format_order_for_display).
+#
+#   python -m benchmarks.serialization [--orders 100000] [--platforms 30] [--skip-db]
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+LEGACY_TIMEZONE = timezone(timedelta(hours=3))
+
+
+# Копии форматтеров до перехода на utils/serialization.py - эталон для сравнения
+def legacy_format_order(order) -> list:
+    utc_time = order.created.replace(tzinfo=timezone.utc)
+    local_time = utc_time.astimezone(LEGACY_TIMEZONE)
+    return [
+        order.id, order.name,
+        order.platform.name if order.platform else "🗑️ Удалена",
+        order.link or "", order.payment_status,
+        order.comment or "",
+        local_time.strftime('%d.%m.%Y %H:%M:%S'),
+    ]
+
+
+def legacy_format_platform(platform) -> list:
+    utc_time = platform.created.replace(tzinfo=timezone.utc)
+    local_time = utc_time.astimezone(LEGACY_TIMEZONE)
+    return [platform.id, platform.name, local_time.strftime('%d.%m.%Y %H:%M:%S')]
+
+
+def legacy_display_date(order) -> str:
+    utc_time = order.created.replace(tzinfo=timezone.utc)
+    return utc_time.astimezone(LEGACY_TIMEZONE).strftime('%d.%m.%Y %H:%M')
+
+
+def make_data(orders: int, platforms: int, seed: int = 1):
+    rnd = random.Random(seed)
+    start = datetime(2023, 12, 31, 20, 0, 0)
+    platform_objs = [
+        SimpleNamespace(id=i, name=f"Платформа {i}", created=start + timedelta(seconds=i))
+        for i in range(1, platforms + 1)
+    ]
+    order_objs = []
+    for i in range(1, orders + 1):
+        platform_id = rnd.randint(1, platforms + 1)  # platforms + 1 - удалённая платформа
+        order_objs.append(SimpleNamespace(
+            id=i, name=f"Заказ {i}", platform_id=platform_id,
+            platform=platform_objs[platform_id - 1] if platform_id <= platforms else None,
+            link=f"https://example.com/{i}" if i % 3 else None,
+            payment_status=rnd.choice(["Ожидает", "Оплачен", "Отменён"]),
+            comment="комментарий" if i % 5 == 0 else None,
+            created=start + timedelta(seconds=rnd.randrange(400 * 24 * 3600), microseconds=rnd.randrange(10**6)),
+        ))
+    return order_objs, platform_objs
+
+
+def timed(fn, rows: int):
+    begin = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - begin
+    return result, rows / elapsed
+
+
+def bench_memory(args):
+    from utils.formatters import format_order_for_display
+    from utils.serialization import (
+        format_timestamp, get_platform_names, order_to_row, platform_to_row, serialize_orders, serialize_platforms
+    )
+
+    orders, platforms = make_data(args.orders, args.platforms)
+    order_rows = [order_to_row(order) for order in orders]
+    platform_rows = [platform_to_row(platform) for platform in platforms]
+    names = get_platform_names(platform_rows)
+
+    legacy, legacy_rate = timed(lambda: [legacy_format_order(order) for order in orders], len(orders))
+    batched, batched_rate = timed(lambda: serialize_orders(order_rows, names), len(orders))
+    assert batched == legacy, "serialize_orders differs from the legacy formatter"
+    assert serialize_platforms(platform_rows) == [legacy_format_platform(p) for p in platforms]
+
+    legacy_dates, legacy_date_rate = timed(lambda: [legacy_display_date(order) for order in orders], len(orders))
+    dates, date_rate = timed(lambda: [format_timestamp(order.created, with_seconds=False) for order in orders], len(orders))
+    assert dates == legacy_dates, "display timestamp differs from the legacy formatter"
+    for order in orders[:1000]:
+        assert f"▪️ <b>Дата:</b> {legacy_display_date(order)}\n" in format_order_for_display(order)
+
+    print(f"{'in-memory, ' + str(len(orders)) + ' orders':<36} | {'rows/sec':>12} | {'speedup':>7}")
+    print(f"{'legacy _format_order':<36} | {legacy_rate:>12,.0f} |")
+    print(f"{'serialize_orders':<36} | {batched_rate:>12,.0f} | {batched_rate / legacy_rate:>6.1f}x")
+    print(f"{'legacy display date':<36} | {legacy_date_rate:>12,.0f} |")
+    print(f"{'format_timestamp(with_seconds=False)':<36} | {date_rate:>12,.0f} | {date_rate / legacy_date_rate:>6.1f}x")
+
+
+async def bench_db(args):
+    from database.engine import create_db, engine, session_maker
+    from database.models import Order, Platform
+    from database.orm_query import orm_get_orders, orm_get_order_rows, orm_get_platform_rows
+    from sqlalchemy import insert
+    from utils.serialization import get_platform_names, serialize_orders
+
+    engine.echo = False
+    orders, platforms = make_data(args.orders, args.platforms)
+    await create_db()
+    async with session_maker() as session:
+        await session.execute(insert(Platform), [{"id": p.id, "name": p.name, "created": p.created} for p in platforms])
+        # Внешние ключи включены, поэтому в базе у всех заказов платформа существует
+        await session.execute(insert(Order), [
+            {"id": o.id, "name": o.name, "platform_id": min(o.platform_id, args.platforms), "link": o.link,
+             "payment_status": o.payment_status, "comment": o.comment, "created": o.created}
+            for o in orders
+        ])
+        await session.commit()
+
+    async def legacy():
+        async with session_maker() as session:
+            return [legacy_format_order(order) for order in await orm_get_orders(session)]
+
+    async def batched():
+        async with session_maker() as session:
+            platform_names = get_platform_names(await orm_get_platform_rows(session))
+            return serialize_orders(await orm_get_order_rows(session), platform_names)
+
+    async def measure(fn):
+        begin = time.perf_counter()
+        rows = await fn()
+        return rows, len(orders) / (time.perf_counter() - begin)
+
+    legacy_rows, legacy_rate = await measure(legacy)
+    batched_rows, batched_rate = await measure(batched)
+    await engine.dispose()
+    assert batched_rows == legacy_rows, "DB path output differs from the legacy formatter"
+
+    print(f"{'sqlite load + format':<36} | {'rows/sec':>12} | {'speedup':>7}")
+    print(f"{'orm_get_orders + _format_order':<36} | {legacy_rate:>12,.0f} |")
+    print(f"{'orm_get_order_rows + serialize':<36} | {batched_rate:>12,.0f} | {batched_rate / legacy_rate:>6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--platforms", type=int, default=30)
+    parser.add_argument("--skip-db", action="store_true", help="only measure in-memory serialization")
+    args = parser.parse_args()
+
+    bench_memory(args)
+    if args.skip_db:
+        return
+    print()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Окружение должно быть готово до импорта database.engine
+        os.environ["DB_LITE"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'serialization.sqlite3')}"
+        os.environ["GOOGLE_SHEETS_ENABLED"] = "0"
+        asyncio.run(bench_db(args))
+
+
+if __name__ == "__main__":
+    main()
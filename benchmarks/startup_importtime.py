@@ -0,0 +1,78 @@
+# Бенчмарк холодного старта: время импорта bot.py по данным `python -X importtime`.
+# Сравнивает медиану с benchmarks/startup_baseline.json и проверяет, что Google-стек не
+# загружается при старте.
+#
+#   python -m benchmarks.startup_importtime [--runs 5] [--tolerance 0.25] [--update]
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+LAZY_MODULES = ("gspread", "google.oauth2", "google_sheets.sheets_api")
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def measure_once(target: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            modules[name] = (int(cumulative), len(indent))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", default="bot")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    parser.add_argument("--update", action="store_true", help="write the measured result as the new baseline")
+    args = parser.parse_args()
+
+    runs = [measure_once(args.target) for _ in range(args.runs)]
+    total_ms = statistics.median(run[args.target][0] for run in runs) / 1000
+
+    last = runs[-1]
+    top_level = sorted(
+        ((name, cumulative) for name, (cumulative, indent) in last.items() if indent == 3),
+        key=lambda item: item[1], reverse=True,
+    )
+    print(f"import {args.target}: {total_ms:.1f} ms (median of {args.runs})")
+    for name, cumulative in top_level[:10]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in last]
+    if eager:
+        print(f"FAIL: modules must be imported lazily: {', '.join(eager)}")
+        failed = True
+
+    if args.update:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"target": args.target, "import_ms": round(total_ms, 1)}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {BASELINE_PATH}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)["import_ms"]
+        limit = baseline * (1 + args.tolerance)
+        print(f"baseline: {baseline:.1f} ms, limit: {limit:.1f} ms")
+        if total_ms > limit:
+            print("FAIL: startup import time regressed")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# Локальная проверка синхронизации с Google Sheets при нескольких процессах бота.
+# Несколько воркеров пишут заказы в общую SQLite-базу и запускают SheetSyncLeader с поддельной
+# таблицей (отдельный SQLite-файл). Текущего лидера периодически убивают через SIGKILL. В конце
+# таблица должна совпасть с базой: без дублей строк и без потерянных изменений.
+#
+#   python -m benchmarks.sync_failover [--workers 3] [--duration 12] [--kills 2]
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import sqlite3
+import sys
+import tempfile
+import time
+
+
+class FakeSheetBackend:
+    # Повторяет поведение sheets_api: поиск строки по ID и дописывание в конец, без уникальности
+    def __init__(self, path: str):
+        self.path = path
+
+    def _execute(self, *queries):
+        with sqlite3.connect(self.path, timeout=15) as conn:
+            for query, params in queries:
+                conn.execute(query, params)
+
+    def _upsert_sync(self, kind: str, entity_id: int, payload: list):
+        with sqlite3.connect(self.path, timeout=15) as conn:
+            found = conn.execute("SELECT rowid FROM sheet WHERE kind = ? AND entity_id = ?", (kind, entity_id)).fetchone()
+            if found:
+                conn.execute("UPDATE sheet SET payload = ? WHERE rowid = ?", (json.dumps(payload), found[0]))
+            else:
+                conn.execute("INSERT INTO sheet VALUES (?, ?, ?)", (kind, entity_id, json.dumps(payload)))
+
+    def _replace_sync(self, kind: str, rows: list):
+        with sqlite3.connect(self.path, timeout=15) as conn:
+            conn.execute("DELETE FROM sheet WHERE kind = ?", (kind,))
+            conn.executemany("INSERT INTO sheet VALUES (?, ?, ?)", [(kind, entity_id, json.dumps(payload)) for entity_id, payload in rows])
+
+    @staticmethod
+    def order_payload(order) -> list:
+        return [order.name, order.platform_id, order.payment_status]
+
+    async def sync_orders_to_sheet(self, orders, platform_names):
+        await asyncio.to_thread(self._replace_sync, "order", [(o.id, self.order_payload(o)) for o in orders])
+
+    async def sync_platforms_to_sheet(self, platforms):
+        await asyncio.to_thread(self._replace_sync, "platform", [(p.id, [p.name]) for p in platforms])
+
+    def _upsert_many_sync(self, kind: str, rows: list):
+        for entity_id, payload in rows:
+            self._upsert_sync(kind, entity_id, payload)
+
+    async def update_orders_in_sheet(self, orders):
+        await asyncio.to_thread(self._upsert_many_sync, "order", [(o.id, self.order_payload(o)) for o in orders])
+
+    async def delete_orders_from_sheet(self, order_ids):
+        await asyncio.to_thread(self._execute, *[("DELETE FROM sheet WHERE kind = 'order' AND entity_id = ?", (order_id,)) for order_id in order_ids])
+
+    async def update_platform_in_sheet(self, platform):
+        await asyncio.to_thread(self._upsert_sync, "platform", platform.id, [platform.name])
+
+    async def delete_platform_from_sheet(self, platform_id: int):
+        await asyncio.to_thread(self._execute, ("DELETE FROM sheet WHERE kind = 'platform' AND entity_id = ?", (platform_id,)))
+
+
+async def worker_main(sheet_path: str, writes_until: float, lease_ttl: float, seed: int, writes_done):
+    from database.engine import engine, session_maker
+    from database.orm_query import orm_add_order, orm_update_order, orm_delete_order, orm_get_orders
+    from google_sheets.sync_leader import SheetSyncLeader
+
+    engine.echo = False
+    rnd = random.Random(seed)
+    leader = SheetSyncLeader(session_maker, lease_ttl=lease_ttl, poll_interval=0.1, batch_size=20, backend=FakeSheetBackend(sheet_path))
+    await leader.start()
+
+    # Общий для всех воркеров срок: замена убитого процесса не пишет дольше остальных
+    while time.time() < writes_until:
+        async with session_maker() as session:
+            action = rnd.random()
+            if action < 0.5:
+                await orm_add_order(session, {"name": f"w{seed}-{rnd.randrange(10**6)}", "platform_id": 1, "payment_status": "Ожидает"})
+            else:
+                orders = await orm_get_orders(session, limit=20)
+                if orders:
+                    order_id = rnd.choice(orders).id
+                    if action < 0.85:
+                        await orm_update_order(session, order_id, {"payment_status": f"Статус {rnd.randrange(100)}"})
+                    else:
+                        await orm_delete_order(session, order_id)
+        await asyncio.sleep(rnd.uniform(0.005, 0.03))
+
+    # Мутации закончились, но процесс продолжает участвовать в выборах, пока его не остановят
+    writes_done.set()
+    while True:
+        await asyncio.sleep(1)
+
+
+def run_worker(sheet_path: str, writes_until: float, lease_ttl: float, seed: int, writes_done):
+    try:
+        asyncio.run(worker_main(sheet_path, writes_until, lease_ttl, seed, writes_done))
+    except KeyboardInterrupt:
+        pass
+
+
+def current_leader_pid(db_path: str) -> int | None:
+    with sqlite3.connect(db_path, timeout=15) as conn:
+        row = conn.execute("SELECT holder, expires_at FROM sync_leases WHERE name = 'sheets_sync'").fetchone()
+    if not row or row[1] < time.time():
+        return None
+    return int(row[0].split(":")[1])
+
+
+def pending_events(db_path: str) -> int:
+    with sqlite3.connect(db_path, timeout=15) as conn:
+        return conn.execute(
+            "SELECT count(*) FROM change_log WHERE seq > coalesce((SELECT position FROM consumer_cursors WHERE name = 'sheets'), 0)"
+        ).fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=12, help="seconds of writes per worker")
+    parser.add_argument("--kills", type=int, default=2, help="how many times to SIGKILL the leader")
+    parser.add_argument("--lease-ttl", type=float, default=1.5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bot.sqlite3")
+    sheet_path = os.path.join(tmp, "sheet.sqlite3")
+    os.environ["DB_LITE"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["GOOGLE_SHEET_KEY"] = "fake"
+    os.environ["GOOGLE_SHEETS_ENABLED"] = "1"
+
+    from database.engine import create_db, engine, session_maker
+    from database.models import Platform
+    engine.echo = False
+
+    async def prepare():
+        await create_db()
+        async with session_maker() as session:
+            session.add(Platform(name="Платформа"))
+            await session.commit()
+        await engine.dispose()
+    asyncio.run(prepare())
+    with sqlite3.connect(sheet_path) as conn:
+        conn.execute("CREATE TABLE sheet (kind TEXT, entity_id INTEGER, payload TEXT)")
+
+    ctx = multiprocessing.get_context("spawn")
+    writes_until = time.time() + args.duration
+    processes, writes_done = {}, {}
+    def spawn(seed: int):
+        done = ctx.Event()
+        process = ctx.Process(target=run_worker, args=(sheet_path, writes_until, args.lease_ttl, seed, done))
+        process.start()
+        processes[process.pid] = process
+        writes_done[process.pid] = done
+
+    for seed in range(args.workers):
+        spawn(seed)
+
+    kill_interval = args.duration / (args.kills + 1)
+    for kill in range(args.kills):
+        time.sleep(kill_interval)
+        pid = current_leader_pid(db_path)
+        if pid in processes:
+            print(f"killing leader pid={pid}")
+            os.kill(pid, signal.SIGKILL)
+            processes.pop(pid).join()
+            writes_done.pop(pid)
+            # Замена убитому процессу, его незавершённые мутации откатились вместе с транзакцией
+            spawn(args.workers + kill)
+
+    # Журнал разбираем только после того, как каждый живой воркер закончил последнюю мутацию
+    for done in writes_done.values():
+        done.wait(max(0.0, writes_until - time.time()) + 30)
+    wait_until = time.time() + 30
+    while pending_events(db_path) and time.time() < wait_until:
+        time.sleep(0.2)
+
+    for process in processes.values():
+        process.terminate()
+        process.join()
+
+    with sqlite3.connect(db_path) as conn:
+        db_orders = {row[0]: [row[1], row[2], row[3]] for row in conn.execute("SELECT id, name, platform_id, payment_status FROM orders")}
+    with sqlite3.connect(sheet_path) as conn:
+        sheet_rows = conn.execute("SELECT entity_id, payload FROM sheet WHERE kind = 'order'").fetchall()
+    sheet_orders = {entity_id: json.loads(payload) for entity_id, payload in sheet_rows}
+
+    duplicates = len(sheet_rows) - len(sheet_orders)
+    missing = db_orders.keys() - sheet_orders.keys()
+    extra = sheet_orders.keys() - db_orders.keys()
+    stale = [order_id for order_id in db_orders.keys() & sheet_orders.keys() if db_orders[order_id] != sheet_orders[order_id]]
+
+    print(f"orders in db: {len(db_orders)}, rows in sheet: {len(sheet_rows)}, pending events: {pending_events(db_path)}")
+    print(f"duplicates: {duplicates}, missing: {len(missing)}, extra: {len(extra)}, stale: {len(stale)}")
+    ok = not (duplicates or missing or extra or stale)
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
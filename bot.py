@@ -8,43 +8,86 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
 
 from database.engine import create_db, session_maker
-from database.orm_query import orm_get_orders, orm_get_platforms
-from google_sheets.sheets_api import sync_orders_to_sheet, sync_platforms_to_sheet
+from google_sheets import plugin as sheets
+from google_sheets.sync_leader import SheetSyncLeader
 
 from handlers import user_commands, platform_management, order_processing
 from middlewares.db import DataBaseSession
-from middlewares.auth import AdminAuthMiddleware
+from middlewares.auth import AdminAuthMiddleware, AdminRegistry
+from middlewares.throttling import ThrottlingMiddleware
+from middlewares.ordering import OrderedUpdatesMiddleware
+from keyboards.inline import Paginator, BulkCallback
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
 
-ADMIN_IDS = {int(admin_id) for admin_id in os.getenv("ADMIN_IDS", "").split(',')}
+ADMINS_REFRESH_INTERVAL = float(os.getenv("ADMINS_REFRESH_INTERVAL", "60"))
+UNAUTHORIZED_REPLY_WINDOW = float(os.getenv("UNAUTHORIZED_REPLY_WINDOW", "300"))
+RATE_LIMIT = int(os.getenv("RATE_LIMIT", "10"))
+RATE_LIMIT_WINDOW = float(os.getenv("RATE_LIMIT_WINDOW", "2"))
+MAX_DB_SESSIONS = int(os.getenv("MAX_DB_SESSIONS", "4"))
+UPDATE_QUEUE_SIZE = int(os.getenv("UPDATE_QUEUE_SIZE", "1000"))
+SHEETS_LEASE_TTL = float(os.getenv("SHEETS_LEASE_TTL", "30"))
+# Фоновая сверка БД с таблицей, 0 - отключена
+SHEETS_RECONCILE_INTERVAL = float(os.getenv("SHEETS_RECONCILE_INTERVAL", "600"))
+SHEETS_RECONCILE_CHUNK_SIZE = int(os.getenv("SHEETS_RECONCILE_CHUNK_SIZE", "200"))
+SHEETS_RECONCILE_MAX_CHUNKS = int(os.getenv("SHEETS_RECONCILE_MAX_CHUNKS", "5"))
+SHEETS_RECONCILE_API_BUDGET = int(os.getenv("SHEETS_RECONCILE_API_BUDGET", "10"))
 
-async def main():
-    await create_db()
-
-    async with session_maker() as session:
-        all_orders = await orm_get_orders(session)
-        await sync_orders_to_sheet(all_orders)
-        
-        all_platforms = await orm_get_platforms(session)
-        await sync_platforms_to_sheet(all_platforms)
-
-    default_properties = DefaultBotProperties(parse_mode="HTML")
-    bot = Bot(token=os.getenv("BOT_TOKEN"), default=default_properties)
-    
+def create_dispatcher() -> Dispatcher:
     storage = MemoryStorage()
     dp = Dispatcher(storage=storage)
 
-    dp.update.middleware(DataBaseSession(session_pool=session_maker))
-    dp.update.middleware(AdminAuthMiddleware(admin_ids=ADMIN_IDS))
+    admins = AdminRegistry(session_pool=session_maker, refresh_interval=ADMINS_REFRESH_INTERVAL)
+    dp["admins"] = admins
+    dp.startup.register(admins.start)
+    dp.shutdown.register(admins.stop)
+
+    # Отсев чужих и слишком частых апдейтов до очереди и до открытия сессии БД
+    dp.update.outer_middleware(AdminAuthMiddleware(admins=admins, reply_window=UNAUTHORIZED_REPLY_WINDOW))
+    dp.update.outer_middleware(ThrottlingMiddleware(rate_limit=RATE_LIMIT, window=RATE_LIMIT_WINDOW))
+
+    # Пока пользователь листает список, промежуточные страницы не запрашиваются и не рисуются
+    ordering = OrderedUpdatesMiddleware(
+        max_pending=UPDATE_QUEUE_SIZE,
+        collapsible_callbacks=(f"{Paginator.__prefix__}:", f"{BulkCallback.__prefix__}:page:"),
+        errors_router=dp,
+    )
+    dp.update.outer_middleware(ordering)
+    dp.shutdown.register(ordering.wait_closed)
+
+    dp.update.middleware(DataBaseSession(session_pool=session_maker, max_sessions=MAX_DB_SESSIONS))
 
     dp.include_router(user_commands.router)
     dp.include_router(platform_management.router)
     dp.include_router(order_processing.router)
-    
+    return dp
+
+async def main():
+    await create_db()
+
+    default_properties = DefaultBotProperties(parse_mode="HTML")
+    bot = Bot(token=os.getenv("BOT_TOKEN"), default=default_properties)
+    dp = create_dispatcher()
+
+    if sheets.is_enabled():
+        # Процессов может быть несколько: полную синхронизацию и запись в таблицу выполняет только лидер
+        sheet_sync = SheetSyncLeader(
+            session_pool=session_maker,
+            lease_ttl=SHEETS_LEASE_TTL,
+            reconcile_interval=SHEETS_RECONCILE_INTERVAL,
+            reconcile_settings={
+                "chunk_size": SHEETS_RECONCILE_CHUNK_SIZE,
+                "max_chunks_per_run": SHEETS_RECONCILE_MAX_CHUNKS,
+                "api_budget": SHEETS_RECONCILE_API_BUDGET,
+            },
+        )
+        dp.startup.register(sheet_sync.start)
+        dp.shutdown.register(sheet_sync.stop)
+
     await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+    # Параллелизм обеспечивает OrderedUpdatesMiddleware, polling-цикл ждёт свободного места в очереди
+    await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types(), handle_as_tasks=False)
 
 if __name__ == "__main__":
     try:
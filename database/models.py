@@ -1,4 +1,4 @@
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Integer, String, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 class Base(DeclarativeBase):
@@ -24,4 +24,35 @@ class Order(Base):
     payment_status: Mapped[str] = mapped_column(String(50), default="Ожидает")
     comment: Mapped[str] = mapped_column(String(500), nullable=True)
     
-    platform = relationship("Platform", back_populates="orders", lazy="joined")
\ No newline at end of file
+    platform = relationship("Platform", back_populates="orders", lazy="joined")
+
+class Admin(Base):
+    __tablename__ = 'admins'
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+
+# Журнал изменений заказов и платформ: только добавление, seq монотонно растёт (AUTOINCREMENT
+# не переиспользует номера, а единственный писатель SQLite фиксирует транзакции в порядке seq).
+# Потребители читают его пачками от своего курсора в consumer_cursors.
+class ChangeLog(Base):
+    __tablename__ = 'change_log'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    entity: Mapped[str] = mapped_column(String(20), nullable=False) # "order" или "platform"
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    op: Mapped[str] = mapped_column(String(10), nullable=False) # "insert", "update" или "delete"
+    changes: Mapped[dict] = mapped_column(JSON, nullable=False) # {поле: [старое, новое]}
+
+class ConsumerCursor(Base):
+    __tablename__ = 'consumer_cursors'
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+class SyncLease(Base):
+    __tablename__ = 'sync_leases'
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(100), nullable=False)
+    expires_at: Mapped[float] = mapped_column(Float, nullable=False)
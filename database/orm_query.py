@@ -1,37 +1,79 @@
-import asyncio
-from sqlalchemy import select, delete, update, func
+import time
+from sqlalchemy import select, delete, update, func, or_
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models import Platform, Order
-from google_sheets.sheets_api import (
-    add_order_to_sheet, update_order_in_sheet, delete_order_from_sheet,
-    add_platform_to_sheet, delete_platform_from_sheet
-)
+from database.models import Admin, Platform, Order, ChangeLog, ConsumerCursor, SyncLease
+from utils.serialization import OrderRow, PlatformRow
+from google_sheets import plugin as sheets
+
+ORDER_FIELDS = ("name", "platform_id", "link", "payment_status", "comment")
+PLATFORM_FIELDS = ("name",)
+
+def _diff(old: dict, new: dict) -> dict:
+    return {field: [old.get(field), new.get(field)] for field in {**old, **new} if old.get(field) != new.get(field)}
+
+async def _begin_write(session: AsyncSession):
+    # pysqlite открывает транзакцию только на первом DML, и SELECT снимка шёл бы без блокировки:
+    # параллельная запись между снимком и UPDATE давала бы в журнале неверный diff. BEGIN IMMEDIATE
+    # сразу берёт блокировку записи, и снимок, изменение и запись в журнал становятся одной транзакцией
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    if not raw_connection.driver_connection.in_transaction:
+        await connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+async def _snapshot(session: AsyncSession, model, fields: tuple, ids: list[int]) -> dict:
+    # Снимок "старых" значений для diff - только внутри транзакции записи
+    await _begin_write(session)
+    query = select(model.id, *(getattr(model, field) for field in fields)).where(model.id.in_(ids))
+    result = await session.execute(query)
+    return {row.id: {field: getattr(row, field) for field in fields} for row in result}
+
+async def _log_changes(session: AsyncSession, entity: str, op: str, changes: dict):
+    # changes: {entity_id: {поле: [старое, новое]}}; записи без изменений в журнал не попадают
+    rows = [{"entity": entity, "entity_id": entity_id, "op": op, "changes": diff} for entity_id, diff in changes.items() if diff]
+    if rows:
+        await session.execute(insert(ChangeLog), rows)
 
 async def orm_add_platform(session: AsyncSession, name: str):
     obj = Platform(name=name)
     session.add(obj)
+    await session.flush()
+    await _log_changes(session, "platform", "insert", {obj.id: _diff({}, {"name": name})})
     await session.commit()
-    await session.refresh(obj)
-    asyncio.create_task(add_platform_to_sheet(obj))
+    sheets.notify_changes()
 
 async def orm_get_platforms(session: AsyncSession):
     query = select(Platform)
     result = await session.execute(query)
     return result.scalars().all()
 
+async def orm_get_platform_rows(session: AsyncSession):
+    # Только столбцы, без ORM-объектов - для полной синхронизации и выгрузок
+    query = select(Platform.id, Platform.name, Platform.created)
+    result = await session.execute(query)
+    return [PlatformRow(*row) for row in result]
+
+async def orm_get_platform(session: AsyncSession, platform_id: int):
+    query = select(Platform).where(Platform.id == platform_id)
+    result = await session.execute(query)
+    return result.scalar_one_or_none()
+
 async def orm_delete_platform(session: AsyncSession, platform_id: int):
+    old = await _snapshot(session, Platform, PLATFORM_FIELDS, [platform_id])
     query = delete(Platform).where(Platform.id == platform_id)
     await session.execute(query)
+    await _log_changes(session, "platform", "delete", {i: _diff(values, {}) for i, values in old.items()})
     await session.commit()
-    asyncio.create_task(delete_platform_from_sheet(platform_id))
+    sheets.notify_changes()
 
 async def orm_add_order(session: AsyncSession, data: dict):
     obj = Order(name=data['name'], platform_id=data['platform_id'], link=data.get('link'), payment_status=data['payment_status'], comment=data.get('comment'))
     session.add(obj)
+    await session.flush()
+    await _log_changes(session, "order", "insert", {obj.id: _diff({}, {field: getattr(obj, field) for field in ORDER_FIELDS})})
     await session.commit()
-    await session.refresh(obj)
-    asyncio.create_task(add_order_to_sheet(obj))
+    sheets.notify_changes()
 
 async def orm_get_order(session: AsyncSession, order_id: int):
     query = select(Order).where(Order.id == order_id)
@@ -45,21 +87,88 @@ async def orm_get_orders(session: AsyncSession, limit: int = None, offset: int =
     result = await session.execute(query)
     return result.scalars().all()
 
+async def orm_get_order_rows(session: AsyncSession):
+    # Без joined-загрузки платформы: имя подставляется при сериализации по словарю платформ
+    query = select(
+        Order.id, Order.name, Order.platform_id, Order.link, Order.payment_status, Order.comment, Order.created
+    ).order_by(Order.id.desc())
+    result = await session.execute(query)
+    return [OrderRow(*row) for row in result]
+
 async def orm_count_orders(session: AsyncSession) -> int:
     query = select(func.count(Order.id))
     result = await session.execute(query)
     return result.scalar_one()
 
 async def orm_update_order(session: AsyncSession, order_id: int, data: dict):
-    query = update(Order).where(Order.id == order_id).values(**data)
+    await orm_bulk_update_orders(session, [order_id], data)
+
+async def orm_delete_order(session: AsyncSession, order_id: int):
+    await orm_bulk_delete_orders(session, [order_id])
+
+async def orm_get_orders_by_ids(session: AsyncSession, order_ids: list[int]):
+    query = select(Order).where(Order.id.in_(order_ids))
+    result = await session.execute(query)
+    return result.scalars().all()
+
+async def orm_bulk_update_orders(session: AsyncSession, order_ids: list[int], data: dict):
+    old = await _snapshot(session, Order, ORDER_FIELDS, order_ids)
+    query = update(Order).where(Order.id.in_(order_ids)).values(**data)
     await session.execute(query)
+    await _log_changes(session, "order", "update", {i: _diff({field: values[field] for field in data}, data) for i, values in old.items()})
     await session.commit()
-    updated_order = await orm_get_order(session, order_id)
-    if updated_order:
-        asyncio.create_task(update_order_in_sheet(updated_order))
+    sheets.notify_changes()
 
-async def orm_delete_order(session: AsyncSession, order_id: int):
-    query = delete(Order).where(Order.id == order_id)
+async def orm_bulk_delete_orders(session: AsyncSession, order_ids: list[int]):
+    old = await _snapshot(session, Order, ORDER_FIELDS, order_ids)
+    query = delete(Order).where(Order.id.in_(order_ids))
     await session.execute(query)
+    await _log_changes(session, "order", "delete", {i: _diff(values, {}) for i, values in old.items()})
     await session.commit()
-    asyncio.create_task(delete_order_from_sheet(order_id))
\ No newline at end of file
+    sheets.notify_changes()
+
+async def orm_get_changes(session: AsyncSession, after_seq: int, limit: int = 500, entity: str = None):
+    query = select(ChangeLog).where(ChangeLog.seq > after_seq).order_by(ChangeLog.seq).limit(limit)
+    if entity: query = query.where(ChangeLog.entity == entity)
+    result = await session.execute(query)
+    return result.scalars().all()
+
+async def orm_get_last_change_seq(session: AsyncSession) -> int:
+    query = select(func.max(ChangeLog.seq))
+    result = await session.execute(query)
+    return result.scalar_one() or 0
+
+async def orm_get_cursor(session: AsyncSession, consumer: str) -> int:
+    query = select(ConsumerCursor.position).where(ConsumerCursor.name == consumer)
+    result = await session.execute(query)
+    return result.scalar_one_or_none() or 0
+
+async def orm_save_cursor(session: AsyncSession, consumer: str, position: int):
+    query = insert(ConsumerCursor).values(name=consumer, position=position)
+    query = query.on_conflict_do_update(index_elements=[ConsumerCursor.name], set_={"position": position})
+    await session.execute(query)
+    await session.commit()
+
+async def orm_get_admin_ids(session: AsyncSession) -> list[int]:
+    query = select(Admin.user_id)
+    result = await session.execute(query)
+    return result.scalars().all()
+
+async def orm_acquire_lease(session: AsyncSession, name: str, holder: str, ttl: float) -> bool:
+    # Захват или продление аренды одним UPSERT: чужая запись перезаписывается только если она истекла
+    now = time.time()
+    query = insert(SyncLease).values(name=name, holder=holder, expires_at=now + ttl)
+    query = query.on_conflict_do_update(
+        index_elements=[SyncLease.name],
+        set_={"holder": holder, "expires_at": now + ttl},
+        where=or_(SyncLease.holder == holder, SyncLease.expires_at < now),
+    )
+    await session.execute(query)
+    await session.commit()
+    result = await session.execute(select(SyncLease.holder).where(SyncLease.name == name))
+    return result.scalar_one_or_none() == holder
+
+async def orm_release_lease(session: AsyncSession, name: str, holder: str):
+    query = delete(SyncLease).where(SyncLease.name == name, SyncLease.holder == holder)
+    await session.execute(query)
+    await session.commit()
\ No newline at end of file
@@ -13,6 +13,10 @@ class EditOrder(StatesGroup):
     select_field = State()
     get_new_value = State()
 
+class BulkEditOrders(StatesGroup):
+    select = State()
+    get_new_status = State()
+
 class AddPlatform(StatesGroup):
     name = State()
 
@@ -0,0 +1,79 @@
+import os
+import asyncio
+import logging
+import importlib
+from typing import Dict, List
+
+from database.models import Order, Platform
+from utils.serialization import OrderRow, PlatformRow
+
+# Точка входа в синхронизацию с Google Sheets. gspread и google.oauth2 тянут за собой
+# большое дерево зависимостей, поэтому sheets_api импортируется только при первой синхронизации.
+# GOOGLE_SHEETS_ENABLED=0 (или пустой GOOGLE_SHEET_KEY) отключает синхронизацию целиком.
+
+_enabled: bool | None = None
+_sheets_api = None
+_reconcile = None
+_import_lock = asyncio.Lock()
+_changes = asyncio.Event()
+
+def is_enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        flag = os.getenv("GOOGLE_SHEETS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+        _enabled = flag and bool(os.getenv("GOOGLE_SHEET_KEY"))
+        if not _enabled:
+            logging.info("SYNC: Google Sheets sync is disabled.")
+    return _enabled
+
+async def _get_api():
+    global _sheets_api
+    if _sheets_api is None:
+        async with _import_lock:
+            if _sheets_api is None:
+                # Импорт в отдельном потоке, чтобы не блокировать event loop
+                _sheets_api = await asyncio.to_thread(importlib.import_module, "google_sheets.sheets_api")
+    return _sheets_api
+
+def notify_changes():
+    # Будит лидера синхронизации в этом процессе, не дожидаясь очередного опроса очереди
+    if is_enabled():
+        _changes.set()
+
+async def wait_for_changes(timeout: float):
+    try:
+        await asyncio.wait_for(_changes.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    _changes.clear()
+
+async def create_reconciler(**settings):
+    # SheetReconciler тянет sheets_api, поэтому модуль тоже загружается лениво
+    global _reconcile
+    if _reconcile is None:
+        _reconcile = await asyncio.to_thread(importlib.import_module, "google_sheets.reconcile")
+    return _reconcile.SheetReconciler(**settings)
+
+async def sync_orders_to_sheet(orders: List[OrderRow], platform_names: Dict[int, str]):
+    if is_enabled():
+        await (await _get_api()).sync_orders_to_sheet(orders, platform_names)
+
+async def update_orders_in_sheet(orders: List[Order]):
+    if is_enabled():
+        await (await _get_api()).update_orders_in_sheet(orders)
+
+async def delete_orders_from_sheet(order_ids: List[int]):
+    if is_enabled():
+        await (await _get_api()).delete_orders_from_sheet(order_ids)
+
+async def sync_platforms_to_sheet(platforms: List[PlatformRow]):
+    if is_enabled():
+        await (await _get_api()).sync_platforms_to_sheet(platforms)
+
+async def update_platform_in_sheet(platform: Platform):
+    if is_enabled():
+        await (await _get_api()).update_platform_in_sheet(platform)
+
+async def delete_platform_from_sheet(platform_id: int):
+    if is_enabled():
+        await (await _get_api()).delete_platform_from_sheet(platform_id)
\ No newline at end of file
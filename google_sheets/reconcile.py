@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from google_sheets.sheets_api import (
+    ORDERS_SHEET_NAME, PLATFORMS_SHEET_NAME, _open_spreadsheet_sync, _update_rows_sync, _delete_rows_sync
+)
+from utils.serialization import OrderRow, PlatformRow, get_platform_names, serialize_orders, serialize_platforms
+
+# Сравниваются столбцы до "Комментария" включительно. Дату создания таблица хранит как дату
+# (USER_ENTERED), её отображение зависит от локали, а в БД она после создания не меняется.
+ORDERS_COMPARE_COLUMNS = 6
+PLATFORMS_COMPARE_COLUMNS = 2
+
+def _cells(row: list, width: int) -> List[str]:
+    cells = [str(value) for value in row[:width]]
+    return cells + [""] * (width - len(cells))
+
+def _checksum(rows: List[List[str]]) -> str:
+    digest = hashlib.md5()
+    for row in rows:
+        digest.update("\x1f".join(row).encode())
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+def _column(index: int) -> str:
+    return chr(ord("A") + index - 1)
+
+class _ApiBudget:
+    def __init__(self, calls: int):
+        self.left = calls
+        self.used = 0
+
+    def take(self) -> bool:
+        if self.left <= 0:
+            return False
+        self.left -= 1
+        self.used += 1
+        return True
+
+# Фоновая сверка БД с листами "Заказы" и "Платформы" без полной пересинхронизации.
+# ID разбиваются на чанки по chunk_size. За прогон читается столбец ID (состав чанков, дубли), затем
+# одним batch_get - строки только тех чанков, где контрольная сумма строк из БД не совпадает с суммой,
+# которую мы видели в таблице при прошлой проверке (плюс verify_chunks_per_run чанков по кругу, чтобы
+# заметить ручные правки). Исправляются только отличающиеся строки: одно batch_update, одно удаление
+# и одно добавление на лист. Каждый запрос к API расходует api_budget прогона, включая два запроса
+# метаданных при открытии таблицы - ручки листов кешируются между прогонами.
+class SheetReconciler:
+    def __init__(self, chunk_size: int = 200, max_chunks_per_run: int = 5, verify_chunks_per_run: int = 1, api_budget: int = 10):
+        self.chunk_size = chunk_size
+        self.max_chunks_per_run = max_chunks_per_run
+        self.verify_chunks_per_run = verify_chunks_per_run
+        self.api_budget = api_budget
+        self._verified: Dict[tuple, str] = {}
+        self._verify_from: Dict[str, int] = defaultdict(int)
+        self._worksheets: Dict[str, Any] | None = None
+        self.last_report: dict = {}
+
+    async def run(self, orders: List[OrderRow], platforms: List[PlatformRow]) -> dict:
+        return await asyncio.to_thread(self._run_rows, orders, platforms)
+
+    def _run_rows(self, orders: List[OrderRow], platforms: List[PlatformRow]) -> dict:
+        order_rows = {row[0]: row for row in serialize_orders(orders, get_platform_names(platforms))}
+        platform_rows = {row[0]: row for row in serialize_platforms(platforms)}
+        return self.run_sync(order_rows, platform_rows)
+
+    def _get_worksheets(self, budget: _ApiBudget) -> Dict[str, Any] | None:
+        if self._worksheets is None:
+            # open_by_key и worksheets() - по запросу метаданных
+            if budget.left < 2:
+                return None
+            budget.take()
+            spreadsheet = _open_spreadsheet_sync()
+            budget.take()
+            self._worksheets = {worksheet.title: worksheet for worksheet in spreadsheet.worksheets()}
+        return self._worksheets
+
+    def run_sync(self, order_rows: Dict[int, list], platform_rows: Dict[int, list]) -> dict:
+        budget = _ApiBudget(self.api_budget)
+        try:
+            worksheets = self._get_worksheets(budget) or {}
+            report = {
+                ORDERS_SHEET_NAME: self._reconcile_sheet(
+                    worksheets.get(ORDERS_SHEET_NAME), order_rows, ORDERS_COMPARE_COLUMNS, budget
+                ),
+                PLATFORMS_SHEET_NAME: self._reconcile_sheet(
+                    worksheets.get(PLATFORMS_SHEET_NAME), platform_rows, PLATFORMS_COMPARE_COLUMNS, budget
+                ),
+            }
+        except Exception:
+            # Лист могли удалить или пересоздать - в следующий раз таблица откроется заново
+            self._worksheets = None
+            raise
+        for sheet_name, stats in report.items():
+            drift = stats.get("updated", 0) + stats.get("appended", 0) + stats.get("deleted", 0)
+            log = logging.warning if drift else logging.info
+            log(f"RECONCILE: '{sheet_name}': {stats}")
+        self.last_report = {**report, "api_calls": budget.used}
+        return self.last_report
+
+    def _reconcile_sheet(self, worksheet, db_rows: Dict[int, list], width: int, budget: _ApiBudget) -> dict:
+        if worksheet is None or not budget.take():
+            return {"skipped": True}
+        sheet_name = worksheet.title
+
+        positions = defaultdict(list)
+        for row_number, value in enumerate(worksheet.col_values(1), start=1):
+            if value.isdigit():
+                positions[int(value)].append(row_number)
+
+        db_chunks, sheet_chunks = defaultdict(set), defaultdict(set)
+        for entity_id in db_rows:
+            db_chunks[entity_id // self.chunk_size].add(entity_id)
+        for entity_id in positions:
+            sheet_chunks[entity_id // self.chunk_size].add(entity_id)
+        chunks = sorted(db_chunks.keys() | sheet_chunks.keys())
+
+        db_sums = {
+            chunk: _checksum([_cells(db_rows[entity_id], width) for entity_id in sorted(db_chunks[chunk])])
+            for chunk in chunks
+        }
+        suspicious = [
+            chunk for chunk in chunks
+            if db_chunks[chunk] != sheet_chunks[chunk]
+            or any(len(positions[entity_id]) > 1 for entity_id in sheet_chunks[chunk])
+            or self._verified.get((sheet_name, chunk)) != db_sums[chunk]
+        ]
+        # Чанки, которые считаются согласованными, тоже перепроверяются по кругу
+        start = self._verify_from[sheet_name]
+        rotation = [chunk for chunk in chunks[start:] + chunks[:start] if chunk not in suspicious][:self.verify_chunks_per_run]
+        if rotation:
+            self._verify_from[sheet_name] = (chunks.index(rotation[-1]) + 1) % len(chunks)
+        selected = (suspicious + rotation)[:self.max_chunks_per_run]
+
+        stats = {"chunks": len(chunks), "suspicious": len(suspicious), "checked": len(selected), "updated": 0, "appended": 0, "deleted": 0}
+        if not selected:
+            return stats
+
+        common = sorted(
+            (positions[entity_id][0], entity_id)
+            for chunk in selected for entity_id in db_chunks[chunk] & sheet_chunks[chunk]
+        )
+        sheet_cells = {}
+        if common:
+            if not budget.take():
+                stats["skipped"] = True
+                return stats
+            ranges = self._row_ranges([row_number for row_number, _ in common], width)
+            values = [row for value_range in worksheet.batch_get(ranges) for row in value_range]
+            sheet_cells = {entity_id: _cells(row, width) for (_, entity_id), row in zip(common, values)}
+
+        updates, appends, deletes = [], [], []
+        for chunk in selected:
+            for entity_id in sorted(db_chunks[chunk]):
+                if entity_id not in positions:
+                    appends.append(db_rows[entity_id])
+                elif sheet_cells.get(entity_id) != _cells(db_rows[entity_id], width):
+                    updates.append((positions[entity_id][0], db_rows[entity_id]))
+            for entity_id in sheet_chunks[chunk]:
+                rows = positions[entity_id]
+                deletes += rows if entity_id not in db_rows else rows[1:]
+
+        repaired = True
+        if updates:
+            if budget.take():
+                _update_rows_sync(worksheet, updates)
+                stats["updated"] = len(updates)
+            else:
+                repaired = False
+        if deletes:
+            if budget.take():
+                _delete_rows_sync(worksheet, deletes)
+                stats["deleted"] = len(deletes)
+            else:
+                repaired = False
+        if appends:
+            if budget.take():
+                worksheet.append_rows(appends, value_input_option='USER_ENTERED')
+                stats["appended"] = len(appends)
+            else:
+                repaired = False
+
+        for chunk in selected:
+            if repaired:
+                self._verified[(sheet_name, chunk)] = db_sums[chunk]
+            else:
+                self._verified.pop((sheet_name, chunk), None)
+        return stats
+
+    @staticmethod
+    def _row_ranges(row_numbers: List[int], width: int) -> List[str]:
+        # Соседние строки объединяются в один диапазон
+        ranges, start, prev = [], None, None
+        for row_number in row_numbers:
+            if start is None:
+                start = prev = row_number
+            elif row_number == prev + 1:
+                prev = row_number
+            else:
+                ranges.append((start, prev))
+                start = prev = row_number
+        if start is not None:
+            ranges.append((start, prev))
+        return [f"A{first}:{_column(width)}{last}" for first, last in ranges]
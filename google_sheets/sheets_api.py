@@ -1,13 +1,15 @@
 import os
 import logging
 import asyncio
-from typing import List
+from typing import Dict, List
 from dotenv import load_dotenv
 
 import gspread
 from google.oauth2.service_account import Credentials
-from datetime import timezone, timedelta
 from database.models import Order, Platform
+from utils.serialization import (
+    OrderRow, PlatformRow, order_to_row, platform_to_row, serialize_orders, serialize_platforms
+)
 
 load_dotenv()
 
@@ -17,79 +19,90 @@ PLATFORMS_SHEET_NAME = "Платформы"
 ORDERS_HEADERS = ["ID Заказа", "Название", "Платформа", "Ссылка", "Статус оплаты", "Комментарий", "Дата создания"]
 PLATFORMS_HEADERS = ["ID Платформы", "Название", "Дата создания"]
 
-LOCAL_TIMEZONE = timezone(timedelta(hours=3))
+def _open_spreadsheet_sync():
+    # open_by_key - один запрос метаданных таблицы
+    creds_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
+    try:
+        gc = gspread.service_account(filename=creds_path)
+        return gc.open_by_key(SHEET_KEY)
+    except FileNotFoundError:
+        logging.error(f"Не найден файл с ключами: {creds_path}. Убедитесь, что путь в .env указан верно.")
+        raise
 
 def _get_worksheet_sync(sheet_name: str):
     try:
-        creds_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
-        gc = gspread.service_account(filename=creds_path)
-        spreadsheet = gc.open_by_key(SHEET_KEY)
+        spreadsheet = _open_spreadsheet_sync()
         worksheet = spreadsheet.worksheet(sheet_name)
         return worksheet
     except FileNotFoundError:
-        logging.error(f"Не найден файл с ключами: {creds_path}. Убедитесь, что путь в .env указан верно.")
         raise
     except Exception as e:
         logging.error(f"Ошибка при подключении к Google API или получении листа '{sheet_name}': {e}", exc_info=True)
         raise
 
-def _format_order(order: Order) -> list:
-    utc_time = order.created.replace(tzinfo=timezone.utc)
-    local_time = utc_time.astimezone(LOCAL_TIMEZONE)
-    
-    return [
-        order.id, order.name,
-        order.platform.name if order.platform else "🗑️ Удалена",
-        order.link or "", order.payment_status,
-        order.comment or "",
-        local_time.strftime('%d.%m.%Y %H:%M:%S'),
-    ]
+def _format_orders(orders: List[Order]) -> List[list]:
+    # Для ORM-объектов из инкрементальной синхронизации: платформа уже загружена через joined
+    platform_names = {order.platform_id: order.platform.name for order in orders if order.platform}
+    return serialize_orders(map(order_to_row, orders), platform_names)
 
 def _format_platform(platform: Platform) -> list:
-    utc_time = platform.created.replace(tzinfo=timezone.utc)
-    local_time = utc_time.astimezone(LOCAL_TIMEZONE)
-    
-    return [platform.id, platform.name, local_time.strftime('%d.%m.%Y %H:%M:%S')]
+    return serialize_platforms([platform_to_row(platform)])[0]
 
-def sync_orders_sync(orders: List[Order]):
+def sync_orders_sync(orders: List[OrderRow], platform_names: Dict[int, str]):
     logging.info(f"SYNC: Starting full synchronization of {len(orders)} ORDERS...")
     worksheet = _get_worksheet_sync(ORDERS_SHEET_NAME)
     worksheet.clear()
     worksheet.append_row(ORDERS_HEADERS)
-    rows_to_add = [_format_order(order) for order in orders]
+    rows_to_add = serialize_orders(orders, platform_names)
     if rows_to_add:
         worksheet.append_rows(rows_to_add, value_input_option='USER_ENTERED')
     logging.info(f"SYNC: Successfully synchronized {len(orders)} orders.")
 
-def add_order_sync(order: Order):
-    logging.info(f"SYNC: Adding order #{order.id} to sheet.")
+def _find_rows_by_id(worksheet, ids) -> dict:
+    # Один запрос на весь столбец ID вместо find() на каждую строку
+    wanted = {str(entity_id) for entity_id in ids}
+    return {int(value): row for row, value in enumerate(worksheet.col_values(1), start=1) if value in wanted}
+
+def _update_rows_sync(worksheet, rows: List[tuple]):
+    # rows: [(номер строки, значения)] - одно batch_update на все строки
+    worksheet.batch_update([
+        {"range": f'A{row_number}:{chr(ord("A")+len(values)-1)}{row_number}', "values": [values]}
+        for row_number, values in rows
+    ])
+
+def _delete_rows_sync(worksheet, row_numbers: List[int]):
+    # Снизу вверх, чтобы удаление строки не сдвигало номера ещё не удалённых
+    worksheet.spreadsheet.batch_update({"requests": [
+        {"deleteDimension": {"range": {"sheetId": worksheet.id, "dimension": "ROWS", "startIndex": row_number - 1, "endIndex": row_number}}}
+        for row_number in sorted(row_numbers, reverse=True)
+    ]})
+
+def update_orders_sync(orders: List[Order]):
+    logging.info(f"SYNC: Updating {len(orders)} orders in sheet.")
     worksheet = _get_worksheet_sync(ORDERS_SHEET_NAME)
-    worksheet.append_row(_format_order(order), value_input_option='USER_ENTERED')
-
-def update_order_sync(order: Order):
-    logging.info(f"SYNC: Updating order #{order.id} in sheet.")
+    rows = _find_rows_by_id(worksheet, [order.id for order in orders])
+    formatted = _format_orders(orders)
+    data = [(rows[order.id], row) for order, row in zip(orders, formatted) if order.id in rows]
+    if data:
+        _update_rows_sync(worksheet, data)
+    missing = [row for order, row in zip(orders, formatted) if order.id not in rows]
+    if missing:
+        logging.warning(f"SYNC: {len(missing)} orders not found for update, adding instead.")
+        worksheet.append_rows(missing, value_input_option='USER_ENTERED')
+
+def delete_orders_sync(order_ids: List[int]):
+    logging.info(f"SYNC: Deleting {len(order_ids)} orders from sheet.")
     worksheet = _get_worksheet_sync(ORDERS_SHEET_NAME)
-    cell = worksheet.find(str(order.id), in_column=1)
-    if not cell:
-        logging.warning(f"SYNC: Order #{order.id} not found for update, adding instead.")
-        add_order_sync(order)
-        return
-    row_values = _format_order(order)
-    worksheet.update(f'A{cell.row}:{chr(ord("A")+len(row_values)-1)}{cell.row}', [row_values])
+    rows = list(_find_rows_by_id(worksheet, order_ids).values())
+    if rows:
+        _delete_rows_sync(worksheet, rows)
 
-def delete_order_sync(order_id: int):
-    logging.info(f"SYNC: Deleting order #{order_id} from sheet.")
-    worksheet = _get_worksheet_sync(ORDERS_SHEET_NAME)
-    cell = worksheet.find(str(order_id), in_column=1)
-    if cell:
-        worksheet.delete_rows(cell.row)
-
-def sync_platforms_sync(platforms: List[Platform]):
+def sync_platforms_sync(platforms: List[PlatformRow]):
     logging.info(f"SYNC: Starting full synchronization of {len(platforms)} PLATFORMS...")
     worksheet = _get_worksheet_sync(PLATFORMS_SHEET_NAME)
     worksheet.clear()
     worksheet.append_row(PLATFORMS_HEADERS)
-    rows_to_add = [_format_platform(p) for p in platforms]
+    rows_to_add = serialize_platforms(platforms)
     if rows_to_add:
         worksheet.append_rows(rows_to_add, value_input_option='USER_ENTERED')
     logging.info(f"SYNC: Successfully synchronized {len(platforms)} platforms.")
@@ -99,6 +112,17 @@ def add_platform_sync(platform: Platform):
     worksheet = _get_worksheet_sync(PLATFORMS_SHEET_NAME)
     worksheet.append_row(_format_platform(platform), value_input_option='USER_ENTERED')
 
+def update_platform_sync(platform: Platform):
+    logging.info(f"SYNC: Updating platform #{platform.id} in sheet.")
+    worksheet = _get_worksheet_sync(PLATFORMS_SHEET_NAME)
+    cell = worksheet.find(str(platform.id), in_column=1)
+    if not cell:
+        logging.warning(f"SYNC: Platform #{platform.id} not found for update, adding instead.")
+        add_platform_sync(platform)
+        return
+    row_values = _format_platform(platform)
+    worksheet.update(f'A{cell.row}:{chr(ord("A")+len(row_values)-1)}{cell.row}', [row_values])
+
 def delete_platform_sync(platform_id: int):
     logging.info(f"SYNC: Deleting platform #{platform_id} from sheet.")
     worksheet = _get_worksheet_sync(PLATFORMS_SHEET_NAME)
@@ -106,23 +130,20 @@ def delete_platform_sync(platform_id: int):
     if cell:
         worksheet.delete_rows(cell.row)
 
-async def sync_orders_to_sheet(orders: List[Order]):
-    await asyncio.to_thread(sync_orders_sync, orders)
-
-async def add_order_to_sheet(order: Order):
-    await asyncio.to_thread(add_order_sync, order)
+async def sync_orders_to_sheet(orders: List[OrderRow], platform_names: Dict[int, str]):
+    await asyncio.to_thread(sync_orders_sync, orders, platform_names)
 
-async def update_order_in_sheet(order: Order):
-    await asyncio.to_thread(update_order_sync, order)
+async def update_orders_in_sheet(orders: List[Order]):
+    await asyncio.to_thread(update_orders_sync, orders)
 
-async def delete_order_from_sheet(order_id: int):
-    await asyncio.to_thread(delete_order_sync, order_id)
+async def delete_orders_from_sheet(order_ids: List[int]):
+    await asyncio.to_thread(delete_orders_sync, order_ids)
 
-async def sync_platforms_to_sheet(platforms: List[Platform]):
+async def sync_platforms_to_sheet(platforms: List[PlatformRow]):
     await asyncio.to_thread(sync_platforms_sync, platforms)
 
-async def add_platform_to_sheet(platform: Platform):
-    await asyncio.to_thread(add_platform_sync, platform)
+async def update_platform_in_sheet(platform: Platform):
+    await asyncio.to_thread(update_platform_sync, platform)
 
 async def delete_platform_from_sheet(platform_id: int):
     await asyncio.to_thread(delete_platform_sync, platform_id)
\ No newline at end of file
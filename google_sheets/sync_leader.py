@@ -0,0 +1,185 @@
+import os
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database.orm_query import (
+    orm_acquire_lease, orm_release_lease, orm_get_changes, orm_get_last_change_seq, orm_get_cursor,
+    orm_save_cursor, orm_get_order_rows, orm_get_orders_by_ids, orm_get_platform, orm_get_platform_rows
+)
+from google_sheets import plugin as sheets
+from utils.serialization import get_platform_names
+
+LEASE_NAME = "sheets_sync"
+CONSUMER_NAME = "sheets"
+
+# Несколько процессов бота делят одну SQLite-базу. Писать в Google Sheets должен только один из них:
+# лидер держит аренду в таблице sync_leases и читает change_log от курсора "sheets", который пополняют все.
+# Обработка записи идемпотентна (строка в таблице приводится к текущему состоянию в БД), а курсор
+# сдвигается только после успешной записи, поэтому при смене лидера записи не теряются и не дублируются.
+class SheetSyncLeader:
+    def __init__(
+        self,
+        session_pool: async_sessionmaker,
+        lease_ttl: float = 30,
+        poll_interval: float = 2,
+        batch_size: int = 200,
+        backend=sheets,
+        reconcile_interval: float = 0,
+        reconcile_settings: dict | None = None,
+    ):
+        self.session_pool = session_pool
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.backend = backend
+        # 0 - фоновая сверка с таблицей отключена
+        self.reconcile_interval = reconcile_interval
+        self.reconcile_settings = reconcile_settings or {}
+        self._reconciler = None
+        self._next_reconcile = 0.0
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._needs_full_sync = False
+        self._lease_deadline = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self.is_leader:
+            # Освобождаем аренду сразу, чтобы другой процесс не ждал её истечения
+            async with self.session_pool() as session:
+                await orm_release_lease(session, LEASE_NAME, self.holder)
+            self.is_leader = False
+
+    async def _run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logging.error(f"SYNC: Sheets sync iteration failed: {e}", exc_info=True)
+            await sheets.wait_for_changes(self.poll_interval)
+
+    def _lease_valid(self) -> bool:
+        # Запас в треть TTL: прекращаем писать раньше, чем аренду сможет перехватить другой процесс
+        return time.time() < self._lease_deadline - self.lease_ttl / 3
+
+    async def _renew_lease(self) -> bool:
+        started = time.time()
+        async with self.session_pool() as session:
+            acquired = await orm_acquire_lease(session, LEASE_NAME, self.holder, self.lease_ttl)
+        if acquired:
+            self._lease_deadline = started + self.lease_ttl
+        elif self.is_leader:
+            logging.warning(f"SYNC: Lost sheets sync leadership ({self.holder}).")
+            self.is_leader = False
+        return acquired
+
+    async def tick(self):
+        if not await self._renew_lease():
+            return
+        # Пока лидер пишет в таблицу, аренда продлевается в фоне: полная перезапись большого листа
+        # или запросы с повторами gspread могут идти дольше lease_ttl. Если продлить не удалось,
+        # текущий шаг отменяется и новые запросы к таблице не начинаются. Уже отправленный из потока
+        # запрос отменить нельзя, поэтому лидер сдаётся за треть TTL до истечения аренды.
+        keepalive = asyncio.create_task(self._hold_lease())
+        work = asyncio.create_task(self._lead())
+        try:
+            await asyncio.wait({keepalive, work}, return_when=asyncio.FIRST_COMPLETED)
+            if not work.done():
+                logging.warning(f"SYNC: Sheets sync lease lost by {self.holder}, aborting the current write.")
+                self.is_leader = False
+        finally:
+            for task in (work, keepalive):
+                task.cancel()
+            await asyncio.gather(keepalive, return_exceptions=True)
+            results = await asyncio.gather(work, return_exceptions=True)
+        if isinstance(results[0], Exception):
+            raise results[0]
+
+    async def _hold_lease(self):
+        while True:
+            await asyncio.sleep(self.lease_ttl / 10)
+            if time.time() < self._lease_deadline - self.lease_ttl * 2 / 3:
+                continue
+            try:
+                if not await self._renew_lease():
+                    return
+            except Exception as e:
+                logging.error(f"SYNC: Failed to renew sheets sync lease: {e}")
+            if not self._lease_valid():
+                return
+
+    async def _lead(self):
+        if not self.is_leader:
+            logging.info(f"SYNC: {self.holder} became sheets sync leader.")
+            self.is_leader = True
+            self._needs_full_sync = True
+        if self._needs_full_sync:
+            # Флаг снимается только после успешной перезаписи: прерванная синхронизация повторится
+            await self._full_sync()
+            self._needs_full_sync = False
+            self._next_reconcile = time.time() + self.reconcile_interval
+        # Каждая пачка - в новой сессии, чтобы читать свежее состояние, а не identity map
+        while self._lease_valid() and await self._process_batch():
+            pass
+        if self.reconcile_interval and time.time() >= self._next_reconcile and self._lease_valid():
+            await self._reconcile()
+
+    async def _full_sync(self):
+        async with self.session_pool() as session:
+            # Всё, что попало в журнал до снимка, в снимке уже учтено
+            last_seq = await orm_get_last_change_seq(session)
+            platforms = await orm_get_platform_rows(session)
+            await self.backend.sync_orders_to_sheet(await orm_get_order_rows(session), get_platform_names(platforms))
+            await self.backend.sync_platforms_to_sheet(platforms)
+            await orm_save_cursor(session, CONSUMER_NAME, last_seq)
+
+    async def _reconcile(self):
+        # Сверка запускается после того, как журнал разобран: расхождения к этому моменту -
+        # это ручные правки таблицы или записи, потерянные при сбое Google API
+        self._next_reconcile = time.time() + self.reconcile_interval
+        if self._reconciler is None:
+            self._reconciler = await self.backend.create_reconciler(**self.reconcile_settings)
+        async with self.session_pool() as session:
+            orders = await orm_get_order_rows(session)
+            platforms = await orm_get_platform_rows(session)
+        await self._reconciler.run(orders, platforms)
+
+    async def _process_batch(self) -> bool:
+        async with self.session_pool() as session:
+            position = await orm_get_cursor(session, CONSUMER_NAME)
+            changes = await orm_get_changes(session, position, limit=self.batch_size)
+            if not changes:
+                return False
+
+            # Несколько изменений одной записи в пачке схлопываются, заказы пишутся в таблицу
+            # одним batch-запросом на обновление и одним на удаление
+            order_ids = list(dict.fromkeys(change.entity_id for change in changes if change.entity == "order"))
+            if order_ids:
+                orders = await orm_get_orders_by_ids(session, order_ids)
+                existing = {order.id for order in orders}
+                if orders:
+                    await self.backend.update_orders_in_sheet(orders)
+                deleted = [order_id for order_id in order_ids if order_id not in existing]
+                if deleted:
+                    await self.backend.delete_orders_from_sheet(deleted)
+
+            platform_ids = dict.fromkeys(change.entity_id for change in changes if change.entity == "platform")
+            for platform_id in platform_ids:
+                platform = await orm_get_platform(session, platform_id)
+                if platform:
+                    await self.backend.update_platform_in_sheet(platform)
+                else:
+                    await self.backend.delete_platform_from_sheet(platform_id)
+
+            await orm_save_cursor(session, CONSUMER_NAME, changes[-1].seq)
+            return True
@@ -6,14 +6,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.orm_query import (
     orm_add_order, orm_get_orders, orm_get_order, orm_update_order,
-    orm_delete_order, orm_get_platforms, orm_count_orders
+    orm_delete_order, orm_get_platforms, orm_count_orders,
+    orm_bulk_update_orders, orm_bulk_delete_orders
 )
-from fsm.states import AddOrder, EditOrder
+from fsm.states import AddOrder, EditOrder, BulkEditOrders
 from keyboards.inline import (
     get_platform_selection_keyboard, get_order_confirmation_keyboard,
     get_delete_confirmation_keyboard, get_field_to_edit_keyboard, OrderCallback, PlatformCallback,
     Paginator, get_skip_keyboard, get_edit_action_keyboard, get_orders_list_keyboard,
-    OrderSelectionCallback, get_order_details_keyboard
+    OrderSelectionCallback, get_order_details_keyboard, BulkCallback, get_orders_bulk_keyboard,
+    get_bulk_delete_confirmation_keyboard, get_back_keyboard
 )
 from utils.formatters import format_order_for_display, format_order_data_for_review
 from handlers.user_commands import cb_main_menu
@@ -22,19 +24,32 @@ router = Router()
 
 ORDERS_PER_PAGE = 5
 
-async def build_orders_list(session: AsyncSession, page: int = 1):
+async def get_orders_page(session: AsyncSession, page: int):
     offset = (page - 1) * ORDERS_PER_PAGE
     orders = await orm_get_orders(session, limit=ORDERS_PER_PAGE, offset=offset)
     total_orders = await orm_count_orders(session)
     total_pages = ceil(total_orders / ORDERS_PER_PAGE) if total_orders > 0 else 1
+    return orders, total_pages
+
+async def build_orders_list(session: AsyncSession, page: int = 1):
+    orders, total_pages = await get_orders_page(session, page)
     
     text = f"📋 <b>Список ваших заказов</b> (Страница {page}/{total_pages})"
     keyboard = get_orders_list_keyboard(orders=orders, page=page, total_pages=total_pages)
     
     return text, keyboard
 
+async def build_bulk_orders_list(session: AsyncSession, page: int, selected: set):
+    orders, total_pages = await get_orders_page(session, page)
+
+    text = f"☑️ <b>Выберите заказы</b> (Страница {page}/{total_pages}, выбрано: {len(selected)})"
+    keyboard = get_orders_bulk_keyboard(orders=orders, page=page, total_pages=total_pages, selected=selected)
+
+    return text, keyboard
+
 @router.callback_query(F.data == "view_orders")
-async def view_orders_list_start(callback: CallbackQuery, session: AsyncSession):
+async def view_orders_list_start(callback: CallbackQuery, session: AsyncSession, state: FSMContext):
+    await state.clear()
     text, keyboard = await build_orders_list(session, page=1)
     await callback.message.edit_text(text, reply_markup=keyboard)
     await callback.answer()
@@ -253,4 +268,62 @@ async def delete_order_confirm(callback: CallbackQuery, callback_data: OrderCall
     await orm_delete_order(session, callback_data.order_id)
     await callback.answer("🗑️ Заказ удален.", show_alert=True)
     text, keyboard = await build_orders_list(session)
+    await callback.message.edit_text(text, reply_markup=keyboard)
+
+@router.callback_query(BulkCallback.filter(F.action == "page"))
+async def bulk_select_page(callback: CallbackQuery, callback_data: BulkCallback, state: FSMContext, session: AsyncSession):
+    if await state.get_state() not in (BulkEditOrders.select.state, BulkEditOrders.get_new_status.state):
+        await state.clear()
+    await state.set_state(BulkEditOrders.select)
+    selected = set((await state.get_data()).get("bulk_selected", []))
+    text, keyboard = await build_bulk_orders_list(session, callback_data.page, selected)
+    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.answer()
+
+@router.callback_query(BulkEditOrders.select, BulkCallback.filter(F.action == "toggle"))
+async def bulk_toggle_order(callback: CallbackQuery, callback_data: BulkCallback, state: FSMContext, session: AsyncSession):
+    selected = set((await state.get_data()).get("bulk_selected", []))
+    selected ^= {callback_data.order_id}
+    await state.update_data(bulk_selected=sorted(selected))
+    text, keyboard = await build_bulk_orders_list(session, callback_data.page, selected)
+    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.answer()
+
+@router.callback_query(BulkEditOrders.select, BulkCallback.filter(F.action.in_({"status", "delete_prompt"})))
+async def bulk_action_prompt(callback: CallbackQuery, callback_data: BulkCallback, state: FSMContext):
+    selected = (await state.get_data()).get("bulk_selected", [])
+    if not selected:
+        await callback.answer("⚠️ Сначала выберите хотя бы один заказ.", show_alert=True)
+        return
+
+    if callback_data.action == "status":
+        back_callback = BulkCallback(action="page", page=callback_data.page).pack()
+        await state.set_state(BulkEditOrders.get_new_status)
+        await callback.message.edit_text(
+            f"💳 Введите новый статус оплаты для {len(selected)} заказов:",
+            reply_markup=get_back_keyboard(back_callback)
+        )
+    else:
+        await callback.message.edit_text(
+            f"Вы уверены, что хотите удалить <b>{len(selected)}</b> заказов?",
+            reply_markup=get_bulk_delete_confirmation_keyboard(len(selected), callback_data.page)
+        )
+    await callback.answer()
+
+@router.message(BulkEditOrders.get_new_status)
+async def bulk_set_status(message: Message, state: FSMContext, session: AsyncSession):
+    selected = (await state.get_data()).get("bulk_selected", [])
+    await orm_bulk_update_orders(session, selected, {"payment_status": message.text})
+    await state.clear()
+    await message.answer(f"✅ Статус обновлён у {len(selected)} заказов.")
+    text, keyboard = await build_orders_list(session)
+    await message.answer(text, reply_markup=keyboard)
+
+@router.callback_query(BulkEditOrders.select, BulkCallback.filter(F.action == "delete_confirm"))
+async def bulk_delete_confirm(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
+    selected = (await state.get_data()).get("bulk_selected", [])
+    await orm_bulk_delete_orders(session, selected)
+    await state.clear()
+    await callback.answer(f"🗑️ Удалено заказов: {len(selected)}.", show_alert=True)
+    text, keyboard = await build_orders_list(session)
     await callback.message.edit_text(text, reply_markup=keyboard)
\ No newline at end of file
@@ -5,6 +5,7 @@ from aiogram.types import Message, CallbackQuery
 
 from keyboards.inline import get_main_menu_keyboard
 from keyboards.reply import get_main_reply_keyboard
+from middlewares.auth import AdminRegistry
 
 router = Router()
 
@@ -45,6 +46,12 @@ async def cmd_cancel(message: Message, state: FSMContext):
     await cmd_start(message, state)
 
 
+@router.message(Command("reload_admins"))
+async def cmd_reload_admins(message: Message, admins: AdminRegistry):
+    await admins.reload()
+    await message.answer(f"🔄 Список администраторов обновлён: {len(admins.ids)}.")
+
+
 @router.message(F.text == "Таблица")
 async def table_test_message(message: Message):
     await message.answer("<a href='https://docs.google.com/spreadsheets/d/1IMI46WTmM--okQJGI3YaWh318HfE2JUsy_w2QNqwpYY/edit?usp=sharing'>📊 Таблица 📊</a>")
\ No newline at end of file
@@ -1,4 +1,5 @@
 from math import ceil
+from functools import lru_cache
 from aiogram.filters.callback_data import CallbackData
 from aiogram.types import InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
@@ -18,6 +19,28 @@ class Paginator(CallbackData, prefix="pag"):
 class OrderSelectionCallback(CallbackData, prefix="sel_ord"):
     order_id: int
 
+class BulkCallback(CallbackData, prefix="bulk"):
+    action: str
+    page: int = 1
+    order_id: int = 0
+
+# Клавиатуры строятся один раз и переиспользуются: статические кешируются целиком,
+# зависящие от заказа - по order_id, зависящие от платформ - по версии набора платформ.
+ORDER_KEYBOARDS_CACHE_SIZE = 256
+PLATFORM_KEYBOARDS_CACHE_SIZE = 8
+
+def get_platforms_version(platforms) -> tuple:
+    return tuple((platform.id, platform.name) for platform in platforms)
+
+@lru_cache(maxsize=1024)
+def _order_selection_cb(order_id: int) -> str:
+    return OrderSelectionCallback(order_id=order_id).pack()
+
+@lru_cache(maxsize=ORDER_KEYBOARDS_CACHE_SIZE)
+def _paginator_cb(action: str, page: int) -> str:
+    return Paginator(action=action, page=page).pack()
+
+@lru_cache(maxsize=None)
 def get_main_menu_keyboard():
     builder = InlineKeyboardBuilder()
     builder.button(text="📝 Создать заказ", callback_data="create_order")
@@ -32,25 +55,62 @@ def get_orders_list_keyboard(orders: list, page: int, total_pages: int):
     for order in orders:
         builder.button(
             text=f"🏷️ {order.name}",
-            callback_data=OrderSelectionCallback(order_id=order.id).pack()
+            callback_data=_order_selection_cb(order.id)
         )
 
     nav_buttons = []
     if page > 1:
-        nav_buttons.append(InlineKeyboardButton(text="⬅️", callback_data=Paginator(action="prev", page=page-1).pack()))
+        nav_buttons.append(InlineKeyboardButton(text="⬅️", callback_data=_paginator_cb("prev", page-1)))
     
     nav_buttons.append(InlineKeyboardButton(text=f"📄 {page}/{total_pages}", callback_data="noop"))
     
     if page < total_pages:
-        nav_buttons.append(InlineKeyboardButton(text="➡️", callback_data=Paginator(action="next", page=page+1).pack()))
+        nav_buttons.append(InlineKeyboardButton(text="➡️", callback_data=_paginator_cb("next", page+1)))
         
     builder.adjust(1)
     builder.row(*nav_buttons, width=3)
+    builder.row(InlineKeyboardButton(text="☑️ Выбрать несколько", callback_data=BulkCallback(action="page", page=page).pack()))
     builder.row(InlineKeyboardButton(text="⬅️ Назад в меню", callback_data="main_menu"))
     
     return builder.as_markup()
 
+def get_orders_bulk_keyboard(orders: list, page: int, total_pages: int, selected: set):
+    builder = InlineKeyboardBuilder()
+
+    for order in orders:
+        mark = "✅" if order.id in selected else "⬜"
+        builder.button(
+            text=f"{mark} {order.name}",
+            callback_data=BulkCallback(action="toggle", page=page, order_id=order.id).pack()
+        )
+
+    nav_buttons = []
+    if page > 1:
+        nav_buttons.append(InlineKeyboardButton(text="⬅️", callback_data=BulkCallback(action="page", page=page-1).pack()))
+
+    nav_buttons.append(InlineKeyboardButton(text=f"📄 {page}/{total_pages}", callback_data="noop"))
+
+    if page < total_pages:
+        nav_buttons.append(InlineKeyboardButton(text="➡️", callback_data=BulkCallback(action="page", page=page+1).pack()))
 
+    builder.adjust(1)
+    builder.row(*nav_buttons, width=3)
+    builder.row(
+        InlineKeyboardButton(text=f"💳 Статус ({len(selected)})", callback_data=BulkCallback(action="status", page=page).pack()),
+        InlineKeyboardButton(text=f"🗑️ Удалить ({len(selected)})", callback_data=BulkCallback(action="delete_prompt", page=page).pack()),
+    )
+    builder.row(InlineKeyboardButton(text="❌ Отменить выбор", callback_data="view_orders"))
+
+    return builder.as_markup()
+
+def get_bulk_delete_confirmation_keyboard(count: int, page: int):
+    builder = InlineKeyboardBuilder()
+    builder.button(text=f"✅ Да, удалить ({count})", callback_data=BulkCallback(action="delete_confirm", page=page).pack())
+    builder.button(text="⬅️ Нет, назад", callback_data=BulkCallback(action="page", page=page).pack())
+    return builder.as_markup()
+
+
+@lru_cache(maxsize=ORDER_KEYBOARDS_CACHE_SIZE)
 def get_order_details_keyboard(order_id: int):
     builder = InlineKeyboardBuilder()
     builder.button(text="✏️ Редактировать", callback_data=OrderCallback(action="edit", order_id=order_id).pack())
@@ -60,12 +120,14 @@ def get_order_details_keyboard(order_id: int):
     return builder.as_markup()
 
 
+@lru_cache(maxsize=ORDER_KEYBOARDS_CACHE_SIZE)
 def get_delete_confirmation_keyboard(order_id: int):
     builder = InlineKeyboardBuilder()
     builder.button(text="✅ Да, удалить", callback_data=OrderCallback(action="delete_confirm", order_id=order_id).pack())
-    builder.button(text="⬅️ Нет, назад", callback_data=OrderSelectionCallback(order_id=order_id).pack()) # Возврат к деталям
+    builder.button(text="⬅️ Нет, назад", callback_data=_order_selection_cb(order_id)) # Возврат к деталям
     return builder.as_markup()
 
+@lru_cache(maxsize=None)
 def get_platform_management_keyboard():
     builder = InlineKeyboardBuilder()
     builder.button(text="➕ Добавить платформу", callback_data="add_platform")
@@ -75,21 +137,27 @@ def get_platform_management_keyboard():
     return builder.as_markup()
 
 def get_platform_selection_keyboard(platforms):
+    return _build_platform_selection_keyboard(get_platforms_version(platforms))
+
+@lru_cache(maxsize=PLATFORM_KEYBOARDS_CACHE_SIZE)
+def _build_platform_selection_keyboard(platforms_version: tuple):
     builder = InlineKeyboardBuilder()
-    for platform in platforms:
+    for platform_id, platform_name in platforms_version:
         builder.button(
-            text=platform.name,
-            callback_data=PlatformCallback(action="select_for_order", platform_id=platform.id).pack()
+            text=platform_name,
+            callback_data=PlatformCallback(action="select_for_order", platform_id=platform_id).pack()
         )
     builder.button(text="❌ Отмена", callback_data="cancel_creation")
     builder.adjust(2)
     return builder.as_markup()
 
+@lru_cache(maxsize=None)
 def get_skip_keyboard(skip_callback_data: str):
     builder = InlineKeyboardBuilder()
     builder.button(text="➡️ Пропустить", callback_data=skip_callback_data)
     return builder.as_markup()
 
+@lru_cache(maxsize=ORDER_KEYBOARDS_CACHE_SIZE)
 def get_edit_action_keyboard(back_callback: str):
     builder = InlineKeyboardBuilder()
     builder.button(text="🗑️ Оставить пустым", callback_data="leave_empty")
@@ -97,17 +165,28 @@ def get_edit_action_keyboard(back_callback: str):
     builder.adjust(1)
     return builder.as_markup()
 
+@lru_cache(maxsize=ORDER_KEYBOARDS_CACHE_SIZE)
+def get_back_keyboard(back_callback: str):
+    builder = InlineKeyboardBuilder()
+    builder.button(text="⬅️ Назад", callback_data=back_callback)
+    return builder.as_markup()
+
 def get_delete_platform_keyboard(platforms):
+    return _build_delete_platform_keyboard(get_platforms_version(platforms))
+
+@lru_cache(maxsize=PLATFORM_KEYBOARDS_CACHE_SIZE)
+def _build_delete_platform_keyboard(platforms_version: tuple):
     builder = InlineKeyboardBuilder()
-    for platform in platforms:
+    for platform_id, platform_name in platforms_version:
         builder.button(
-            text=f"❌ {platform.name}",
-            callback_data=PlatformCallback(action="delete", platform_id=platform.id).pack()
+            text=f"❌ {platform_name}",
+            callback_data=PlatformCallback(action="delete", platform_id=platform_id).pack()
         )
     builder.button(text="⬅️ Назад", callback_data="manage_platforms")
     builder.adjust(1)
     return builder.as_markup()
 
+@lru_cache(maxsize=None)
 def get_order_confirmation_keyboard():
     builder = InlineKeyboardBuilder()
     builder.button(text="✅ Сохранить", callback_data="confirm_save_order")
@@ -115,7 +194,8 @@ def get_order_confirmation_keyboard():
     builder.button(text="❌ Отмена", callback_data="cancel_creation")
     builder.adjust(1)
     return builder.as_markup()
-    
+
+@lru_cache(maxsize=ORDER_KEYBOARDS_CACHE_SIZE)
 def get_field_to_edit_keyboard(order_id: int, for_creation=False):
     builder = InlineKeyboardBuilder()
     prefix = "edit_creation" if for_creation else "edit_existing"
@@ -124,7 +204,7 @@ def get_field_to_edit_keyboard(order_id: int, for_creation=False):
         cb_data = f"{prefix}:{field}"
         if not for_creation: cb_data += f":{order_id}"
         builder.button(text=text, callback_data=cb_data)
-    back_cb = "back_to_confirmation" if for_creation else OrderSelectionCallback(order_id=order_id).pack()
+    back_cb = "back_to_confirmation" if for_creation else _order_selection_cb(order_id)
     builder.button(text="⬅️ Назад", callback_data=back_cb)
     builder.adjust(2)
     return builder.as_markup()
\ No newline at end of file
@@ -1,12 +1,88 @@
-from typing import Callable, Dict, Any, Awaitable, Set
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Awaitable, Iterable, Set
+from dotenv import dotenv_values
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject, User
-from aiogram.dispatcher.flags import get_flag
-from aiogram.utils.chat_action import ChatActionSender
+from aiogram.types import TelegramObject, Update, User, Message, CallbackQuery
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from database.orm_query import orm_get_admin_ids
+
+TRACKED_USERS_LIMIT = 10_000
+
+def parse_admin_ids(raw: str | None) -> Set[int]:
+    return {int(admin_id) for admin_id in (raw or "").split(',') if admin_id.strip()}
+
+# Список админов = ADMIN_IDS из окружения/.env плюс таблица admins. Перечитывается в фоне
+# и по команде /reload_admins, без перезапуска бота.
+class AdminRegistry:
+    def __init__(self, session_pool: async_sessionmaker, refresh_interval: float = 60):
+        self.session_pool = session_pool
+        self.refresh_interval = refresh_interval
+        # load_dotenv() при старте не перезаписывает окружение процесса, поэтому ADMIN_IDS,
+        # заданный при деплое, важнее .env. Если же значение пришло из .env, при перезагрузке
+        # файл перечитывается заново (без изменения os.environ)
+        self._process_admin_ids = os.getenv("ADMIN_IDS")
+        self._admin_ids_from_dotenv = self._process_admin_ids in (None, dotenv_values().get("ADMIN_IDS"))
+        self.ids: frozenset[int] = frozenset(parse_admin_ids(self._process_admin_ids))
+        self._task: asyncio.Task | None = None
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.ids
+
+    async def reload(self):
+        raw = dotenv_values().get("ADMIN_IDS") if self._admin_ids_from_dotenv else self._process_admin_ids
+        env_ids = parse_admin_ids(raw)
+        async with self.session_pool() as session:
+            db_ids = await orm_get_admin_ids(session)
+        ids = frozenset(env_ids | set(db_ids))
+        if ids != self.ids:
+            logging.info(f"Admin list reloaded: {len(ids)} admins.")
+        self.ids = ids
+
+    async def start(self):
+        await self.reload()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                logging.error(f"Failed to reload admin list: {e}", exc_info=True)
+
+# Outer-middleware на уровне Update: чужие апдейты отбрасываются до очереди, сессии БД и хендлеров.
+# Отказ отправляется одному пользователю не чаще раза в reply_window секунд.
 class AdminAuthMiddleware(BaseMiddleware):
-    def __init__(self, admin_ids: Set[int]):
-        self.admin_ids = admin_ids
+    def __init__(self, admins: Iterable[int], reply_window: float = 300):
+        self.admins = admins
+        self.reply_window = reply_window
+        # Порядок вставки = порядок ответов: самые старые записи всегда в начале
+        self._replied: OrderedDict[int, float] = OrderedDict()
+
+    def _should_reply(self, user_id: int) -> bool:
+        now = time.monotonic()
+        while self._replied:
+            oldest = next(iter(self._replied.values()))
+            if now - oldest < self.reply_window:
+                break
+            self._replied.popitem(last=False)
+        if user_id in self._replied:
+            return False
+        if len(self._replied) >= TRACKED_USERS_LIMIT:
+            # Флуд с множества аккаунтов внутри окна: память ограничена, вытесняем самого старого
+            self._replied.popitem(last=False)
+        self._replied[user_id] = now
+        return True
 
     async def __call__(
         self,
@@ -16,9 +92,10 @@ class AdminAuthMiddleware(BaseMiddleware):
     ) -> Any:
         user: User | None = data.get("event_from_user")
 
-        if not user or user.id not in self.admin_ids:
-            if isinstance(event, (Message, CallbackQuery)):
-                 await event.answer("❌ У вас нет доступа к этому боту.", show_alert=isinstance(event, CallbackQuery))
+        if not user or user.id not in self.admins:
+            inner = event.event if isinstance(event, Update) else event
+            if user and isinstance(inner, (Message, CallbackQuery)) and self._should_reply(user.id):
+                await inner.answer("❌ У вас нет доступа к этому боту.", show_alert=isinstance(inner, CallbackQuery))
             return
 
         return await handler(event, data)
\ No newline at end of file
@@ -1,11 +1,92 @@
+import asyncio
+import logging
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# Сессия, которая занимает разрешение db_permits только на время работы с БД, а не на весь хендлер:
+# ожидание ответов Telegram API (edit_text, answer, send_message) разрешение не держит.
+# После чтения транзакции в SQLite не остаётся, и разрешение возвращается сразу. После записи оно
+# держится до commit/rollback, чтобы писатели не толкались за блокировку SQLite.
+class LimitedSession(AsyncSession):
+    db_permits: asyncio.Semaphore | None = None
+    _holds_permit = False
+
+    async def _acquire(self):
+        if self.db_permits is not None and not self._holds_permit:
+            await self.db_permits.acquire()
+            self._holds_permit = True
+
+    def _release(self):
+        if self._holds_permit:
+            self._holds_permit = False
+            self.db_permits.release()
+
+    async def _release_if_idle(self):
+        if not self._holds_permit:
+            return
+        try:
+            connection = await super().connection()
+            raw_connection = await connection.get_raw_connection()
+            idle = not raw_connection.driver_connection.in_transaction
+        except Exception as e:
+            logging.warning(f"Failed to check DB transaction state, keeping the permit until commit: {e}")
+            return
+        if idle:
+            self._release()
+
+    async def _run(self, method, *args, **kwargs):
+        await self._acquire()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            await self._release_if_idle()
+
+    async def execute(self, *args, **kwargs):
+        return await self._run(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._run(super().scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await self._run(super().scalars, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._run(super().get, *args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        return await self._run(super().flush, *args, **kwargs)
+
+    async def connection(self, *args, **kwargs):
+        # Соединение отдаётся наружу (например, для BEGIN IMMEDIATE), поэтому разрешение держится до commit
+        await self._acquire()
+        return await super().connection(*args, **kwargs)
+
+    async def commit(self):
+        try:
+            await super().commit()
+        finally:
+            self._release()
+
+    async def rollback(self):
+        try:
+            await super().rollback()
+        finally:
+            self._release()
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            self._release()
 
 class DataBaseSession(BaseMiddleware):
-    def __init__(self, session_pool: async_sessionmaker):
-        self.session_pool = session_pool
+    def __init__(self, session_pool: async_sessionmaker, max_sessions: int | None = None):
+        # Ограничиваем число сессий, одновременно работающих с БД, чтобы не душить единственного
+        # писателя SQLite. Сами хендлеры при этом выполняются параллельно без ограничения
+        self.semaphore = asyncio.Semaphore(max_sessions) if max_sessions else None
+        self.session_pool = async_sessionmaker(class_=LimitedSession, **session_pool.kw) if self.semaphore else session_pool
 
     async def __call__(
         self,
@@ -14,5 +95,7 @@ class DataBaseSession(BaseMiddleware):
         data: Dict[str, Any],
     ) -> Any:
         async with self.session_pool() as session:
+            if self.semaphore is not None:
+                session.db_permits = self.semaphore
             data["session"] = session
-            return await handler(event, data)
\ No newline at end of file
+            return await handler(event, data)
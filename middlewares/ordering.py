@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Dict, Any, Awaitable, Deque, Hashable, Iterable, List, Set, Tuple
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.methods import TelegramMethod
+from aiogram.types import ErrorEvent, TelegramObject, Update
+
+Job = Tuple[Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]], TelegramObject, Dict[str, Any]]
+
+# Апдейты одного чата/пользователя обрабатываются строго по очереди, разных - параллельно.
+# Рассчитан на start_polling(handle_as_tasks=False): пока очередь заполнена, polling-цикл
+# ждёт в __call__ и не забирает новые апдейты (backpressure).
+# Callback'и навигации (data начинается с одного из collapsible_callbacks) для одного сообщения
+# схлопываются: ещё не начатые предыдущие выбрасываются из очереди с пустым answer(), и
+# запрашивается и рисуется только последняя выбранная страница.
+# Хендлер выполняется уже после возврата из feed_update: ErrorsMiddleware диспетчера к этому
+# моменту отработал, поэтому исключения передаются в обработчики errors_router (обычно сам
+# Dispatcher) отсюда, а необработанные только логируются. По той же причине aiogram пишет
+# "Update ... is handled" в момент постановки в очередь, а не по завершении хендлера.
+class OrderedUpdatesMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        max_pending: int = 1000,
+        collapsible_callbacks: Iterable[str] = (),
+        errors_router: Router | None = None,
+    ):
+        self.max_pending = max_pending
+        self.collapsible_callbacks = tuple(collapsible_callbacks)
+        self.errors_router = errors_router
+        self._slots = asyncio.Semaphore(max_pending)
+        self._queues: Dict[Hashable, Deque[Job]] = {}
+        self._workers: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _get_key(event: TelegramObject, data: Dict[str, Any]) -> Hashable:
+        event_context = data.get("event_context")
+        if event_context is None or (event_context.chat_id is None and event_context.user_id is None):
+            # Без контекста упорядочивать нечего - каждый апдейт идёт своей очередью
+            return ("update", event.update_id if isinstance(event, Update) else id(event))
+        return (event_context.chat_id, event_context.user_id)
+
+    def _collapse_key(self, event: TelegramObject) -> Hashable | None:
+        callback = event.callback_query if isinstance(event, Update) else None
+        if (
+            not self.collapsible_callbacks
+            or callback is None
+            or callback.message is None
+            or not (callback.data or "").startswith(self.collapsible_callbacks)
+        ):
+            return None
+        return (callback.message.chat.id, callback.message.message_id)
+
+    def _collapse(self, queue: Deque[Job], key: Hashable) -> List[Job]:
+        # Синхронно: между перестройкой очереди и добавлением нового апдейта не должно быть await,
+        # иначе воркер может успеть опустошить очередь и завершиться. queue[0] уже выполняется
+        if len(queue) < 2:
+            return []
+        running, *waiting = queue
+        skipped = [job for job in waiting if self._collapse_key(job[1]) == key]
+        if skipped:
+            queue.clear()
+            queue.append(running)
+            queue.extend(job for job in waiting if self._collapse_key(job[1]) != key)
+            for _ in skipped:
+                self._slots.release()
+        return skipped
+
+    @staticmethod
+    async def _answer_skipped(skipped: List[Job]):
+        for _, event, _ in skipped:
+            try:
+                await event.callback_query.answer()
+            except Exception as e:
+                logging.warning(f"Failed to answer collapsed callback {event.update_id}: {e}")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        await self._slots.acquire()
+
+        key = self._get_key(event, data)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            worker = asyncio.create_task(self._drain(key, queue))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+        skipped = []
+        collapse_key = self._collapse_key(event)
+        if collapse_key is not None:
+            skipped = self._collapse(queue, collapse_key)
+        queue.append((handler, event, data))
+        if skipped:
+            await self._answer_skipped(skipped)
+
+    async def _drain(self, key: Hashable, queue: Deque[Job]):
+        try:
+            while queue:
+                handler, event, data = queue[0]
+                try:
+                    # FSMContextMiddleware снимает raw_state ещё при постановке в очередь,
+                    # а предыдущие апдейты этого пользователя могли его изменить
+                    state = data.get("state")
+                    if state is not None:
+                        data["raw_state"] = await state.get_state()
+                    response = await handler(event, data)
+                    if isinstance(response, TelegramMethod):
+                        await data["bot"](response)
+                except Exception as e:
+                    await self._handle_error(key, event, data, e)
+                finally:
+                    queue.popleft()
+                    self._slots.release()
+        finally:
+            del self._queues[key]
+
+    async def _handle_error(self, key: Hashable, event: TelegramObject, data: Dict[str, Any], exception: Exception):
+        # То же, что делает ErrorsMiddleware, но уже в воркере очереди
+        try:
+            if self.errors_router is not None and isinstance(event, Update):
+                response = await self.errors_router.propagate_event(
+                    update_type="error", event=ErrorEvent(update=event, exception=exception), **data
+                )
+                if response is not UNHANDLED:
+                    if isinstance(response, TelegramMethod):
+                        await data["bot"](response)
+                    return
+        except Exception as e:
+            logging.exception(f"Error handler failed for update {getattr(event, 'update_id', None)}: {e}")
+        logging.error(
+            f"Error while processing update {getattr(event, 'update_id', None)} for {key}: {exception}",
+            exc_info=exception,
+        )
+
+    async def wait_closed(self):
+        while self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
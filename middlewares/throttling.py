@@ -0,0 +1,52 @@
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Any, Awaitable, Deque
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update, User, CallbackQuery
+
+TRACKED_USERS_LIMIT = 10_000
+
+# Защита от серий случайных повторных нажатий: не больше rate_limit апдейтов от одного
+# пользователя за скользящее окно window секунд. Лишние апдейты отбрасываются, на callback
+# отвечаем пустым answer(), чтобы у кнопки пропали "часики". rate_limit=0 отключает ограничение.
+class ThrottlingMiddleware(BaseMiddleware):
+    def __init__(self, rate_limit: int = 10, window: float = 2):
+        self.rate_limit = rate_limit
+        self.window = window
+        # Пользователи упорядочены по времени последнего апдейта: неактивные - в начале
+        self._hits: OrderedDict[int, Deque[float]] = OrderedDict()
+
+    def _allow(self, user_id: int) -> bool:
+        now = time.monotonic()
+        while self._hits:
+            last_hit = next(iter(self._hits.values()))[-1]
+            if now - last_hit < self.window:
+                break
+            self._hits.popitem(last=False)
+        hits = self._hits.get(user_id)
+        if hits is None:
+            if len(self._hits) >= TRACKED_USERS_LIMIT:
+                self._hits.popitem(last=False)
+            hits = self._hits[user_id] = deque(maxlen=self.rate_limit)
+        else:
+            self._hits.move_to_end(user_id)
+        if len(hits) == self.rate_limit and now - hits[0] < self.window:
+            return False
+        hits.append(now)
+        return True
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+
+        if self.rate_limit > 0 and user and not self._allow(user.id):
+            inner = event.event if isinstance(event, Update) else event
+            if isinstance(inner, CallbackQuery):
+                await inner.answer()
+            return
+
+        return await handler(event, data)
\ No newline at end of file
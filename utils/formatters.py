@@ -1,16 +1,11 @@
-from datetime import datetime, timezone, timedelta
-
-# UTC+3
-LOCAL_TIMEZONE = timezone(timedelta(hours=3))
+from utils.serialization import DELETED_PLATFORM_NAME, format_timestamp
 
 def format_order_for_display(order):
-    utc_time = order.created.replace(tzinfo=timezone.utc)
-    local_time = utc_time.astimezone(LOCAL_TIMEZONE)
-    created_date = local_time.strftime('%d.%m.%Y %H:%M')
+    created_date = format_timestamp(order.created, with_seconds=False)
 
     comment_text = f"<i>{order.comment}</i>" if order.comment else "<em>(пусто)</em>"
     link_text = f"<a href='{order.link}'>Открыть</a>" if order.link else "<em>(нет ссылки)</em>"
-    platform_name = order.platform.name if order.platform else "🗑️ Удалена"
+    platform_name = order.platform.name if order.platform else DELETED_PLATFORM_NAME
     
     return (
         f"<b>🏷️ {order.name}</b>\n"
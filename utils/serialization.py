@@ -0,0 +1,60 @@
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# UTC+3. Единственная настройка часового пояса: смещение для format_timestamp берётся отсюда
+LOCAL_TIMEZONE = timezone(timedelta(hours=3))
+_LOCAL_OFFSET = LOCAL_TIMEZONE.utcoffset(None)
+DELETED_PLATFORM_NAME = "🗑️ Удалена"
+
+# Лёгкие строки вместо ORM-объектов: без identity map, без joined-загрузки платформы.
+# Поля в порядке столбцов запроса из orm_get_order_rows / orm_get_platform_rows.
+class OrderRow(NamedTuple):
+    id: int
+    name: str
+    platform_id: int
+    link: Optional[str]
+    payment_status: str
+    comment: Optional[str]
+    created: datetime
+
+class PlatformRow(NamedTuple):
+    id: int
+    name: str
+    created: datetime
+
+def format_timestamp(created: datetime, with_seconds: bool = True) -> str:
+    # То же, что replace(tzinfo=utc).astimezone(LOCAL_TIMEZONE).strftime(...), но без
+    # создания aware-datetime и разбора формата на каждой строке: смещение фиксированное
+    t = created + _LOCAL_OFFSET
+    if with_seconds:
+        return f"{t.day:02d}.{t.month:02d}.{t.year} {t.hour:02d}:{t.minute:02d}:{t.second:02d}"
+    return f"{t.day:02d}.{t.month:02d}.{t.year} {t.hour:02d}:{t.minute:02d}"
+
+def order_to_row(order) -> OrderRow:
+    # Не обращается к order.platform
+    return OrderRow(order.id, order.name, order.platform_id, order.link, order.payment_status, order.comment, order.created)
+
+def platform_to_row(platform) -> PlatformRow:
+    return PlatformRow(platform.id, platform.name, platform.created)
+
+def get_platform_names(platforms: Iterable[PlatformRow]) -> Dict[int, str]:
+    return {platform.id: platform.name for platform in platforms}
+
+def serialize_orders(orders: Iterable[OrderRow], platform_names: Dict[int, str]) -> List[list]:
+    # Строки листа "Заказы" (ORDERS_HEADERS). Имена платформ берутся из готового словаря,
+    # одинаковые метки времени (заказы, созданные одной пачкой) форматируются один раз
+    timestamps: Dict[datetime, str] = {}
+    rows = []
+    for order_id, name, platform_id, link, payment_status, comment, created in orders:
+        created_text = timestamps.get(created)
+        if created_text is None:
+            created_text = timestamps[created] = format_timestamp(created)
+        rows.append([
+            order_id, name, platform_names.get(platform_id, DELETED_PLATFORM_NAME),
+            link or "", payment_status, comment or "", created_text,
+        ])
+    return rows
+
+def serialize_platforms(platforms: Iterable[PlatformRow]) -> List[list]:
+    # Строки листа "Платформы" (PLATFORMS_HEADERS)
+    return [[platform_id, name, format_timestamp(created)] for platform_id, name, created in platforms]